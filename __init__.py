@@ -25,8 +25,17 @@ __all__ = [
     "add_attendance",
     "app",
     "attendance",
+    "db_pool",
+    "exam_roster",
     "fetch_data",
     "generate_hallplan",
+    "hallplan_cache",
+    "http_cache",
+    "ingest",
+    "jobs",
+    "metrics",
+    "refdata",
+    "seating",
     "update_data.py"
 ]
 
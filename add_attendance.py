@@ -14,7 +14,13 @@
 
 
 from Timetable.typehints import Connection, Cursor, Optional
+from collections.abc import Iterable
+import csv
 import datetime
+import exam_roster
+import io
+import tempfile
+import time
 
 """
 Adds the data in the attendance, slots and invigilator tables.
@@ -42,23 +48,96 @@ def add_attendance(db_connector: Connection,
                    class_id: Optional[int] = None,
                    seat: Optional[int] = None,
                    is_present: Optional[bool]) -> None:
-    cursor.execute("""INSERT INTO `attendance`
-                   (`student_id`, `date`, `slot_no`,
-                   `course_code`, `class_id`, `seat`, `is_present`)
-                   VALUES (%s, %s, %s, %s, %s, %s, %s)""",
-                   (student_id, date, slot_no,
-                    course_code, class_id, seat, is_present))
+    try:
+        cursor.execute("""INSERT INTO `attendance`
+                       (`student_id`, `date`, `slot_no`,
+                       `course_code`, `class_id`, `seat`, `is_present`)
+                       VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+                       (student_id, date, slot_no,
+                        course_code, class_id, seat, is_present))
+        exam_roster.rebuild(cursor, [(date, slot_no)])
+    except Exception:
+        db_connector.rollback()
+        raise
+
     db_connector.commit()
 
 
 def add_attendances(db_connector: Connection,
                     cursor: Cursor,
-                    students: list[tuple[bool | int | str]]) -> None:
-    cursor.executemany("""INSERT INTO `attendance`
-                       (`student_id`, `date`, `slot_no`,
-                       `course_code`, `class_id`, `seat`, `is_present`)
-                       VALUES (%s, %s, %s, %s, %s, %s, %s)""", students)
+                    students: list[tuple[bool | int | str, ...]], *,
+                    chunk_size: Optional[int] = None,
+                    groups: Optional[
+                        Iterable[tuple[datetime.date, int]]
+                    ] = None) -> list[float]:
+    """
+    Inserts the students in chunks of ``chunk_size`` rows within a single
+    transaction, returning the seconds spent on each chunk.
+    The roster of the (date, slot_no) ``groups``, by default those of
+    ``students``, is rebuilt in the same transaction.
+    """
+    if groups is None:
+        groups = [(student[1], student[2]) for student in students]
+    chunk_size = chunk_size or len(students) or 1
+    timings = []
+    try:
+        for i in range(0, len(students), chunk_size):
+            start = time.perf_counter()
+            cursor.executemany("""INSERT INTO `attendance`
+                               (`student_id`, `date`, `slot_no`,
+                               `course_code`, `class_id`, `seat`,
+                               `is_present`)
+                               VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+                               students[i:i + chunk_size])
+            timings.append(time.perf_counter() - start)
+        exam_roster.rebuild(cursor, groups)
+    except Exception:
+        db_connector.rollback()
+        raise
+
+    db_connector.commit()
+    return timings
+
+
+def load_attendances(db_connector: Connection,
+                     cursor: Cursor,
+                     students: str, *,
+                     groups: Optional[
+                         Iterable[tuple[datetime.date, int]]
+                     ] = None) -> float:
+    """
+    Bulk loads the attendance rows of the CSV text ``students``
+    with ``LOAD DATA LOCAL INFILE``, returning the seconds it took.
+    The roster of the (date, slot_no) ``groups``, by default those of
+    ``students``, is rebuilt in the same transaction.
+
+    The connection must be opened with ``local_infile=True``.
+    The client reads local files by path, so the buffer is
+    spooled to a temporary file for the duration of the load.
+    """
+    if groups is None:
+        groups = [(datetime.date.fromisoformat(row[1]), int(row[2]))
+                  for row in csv.reader(io.StringIO(students))]
+    with tempfile.NamedTemporaryFile("w", suffix=".csv") as spool:
+        spool.write(students)
+        spool.flush()
+        start = time.perf_counter()
+        try:
+            cursor.execute("""LOAD DATA LOCAL INFILE %s
+                           INTO TABLE `attendance`
+                           FIELDS TERMINATED BY ','
+                           LINES TERMINATED BY '\\n'
+                           (`student_id`, `date`, `slot_no`,
+                           `course_code`, `class_id`, `seat`,
+                           `is_present`)""", (spool.name,))
+            seconds = time.perf_counter() - start
+            exam_roster.rebuild(cursor, groups)
+        except Exception:
+            db_connector.rollback()
+            raise
+
     db_connector.commit()
+    return seconds
 
 
 def add_invigilator(db_connector: Connection,
@@ -67,8 +146,8 @@ def add_invigilator(db_connector: Connection,
                     date: Optional[datetime.date] = None,
                     slot_no: Optional[int] = None,
                     class_id: Optional[int] = None) -> None:
-    cursor.execute("""INSERT INTO `invigilator`
+    cursor.execute("""INSERT INTO `invigilators`
                    (`faculty_id`, `date`, `slot_no`, `class_id`)
-                   VALUES (%s, %s, %s, %s, %s, %s)""",
+                   VALUES (%s, %s, %s, %s)""",
                    (faculty_id, date, slot_no, class_id))
     db_connector.commit()
@@ -15,20 +15,40 @@
 
 from Timetable.app import (about, check_login, login, logout,
                            nocache, page_not_found, sql)
-from Timetable.fetch_data import get_classes
-from Timetable.show_data import get_building_id, get_school_id, get_schools
-from Timetable.typehints import Response
+from Timetable.show_data import get_schools
+from Timetable.typehints import Connection, Cursor, Optional, Response
+from attendance import create_hallplan
+from collections.abc import Callable, Mapping
 from datetime import datetime
-from flask import Flask, redirect, render_template, request, url_for
-from generate_hallplan import (generate_hallplan, process_hall,
-                               process_schedule, process_slot, put_attendance)
-from jinja2 import FileSystemLoader
-import ast
+from flask import (Flask, before_render_template, g, jsonify, redirect,
+                   render_template, request, session, template_rendered,
+                   url_for)
+from functools import partial, wraps
+from generate_hallplan import (STRATEGIES, assign_invigilators,
+                               generate_hallplan, hall_usage, process_hall,
+                               process_invigilators, process_schedule,
+                               process_slot, put_attendance, put_invigilators,
+                               replan_hallplan, summarize_hallplan)
+from jinja2 import FileSystemLoader, Template
+import db_pool
+import exam_roster
 import fetch_data
+import hallplan_cache
+import hashlib
+import http_cache
+import ingest
+import io
+import jobs
+import json
+import metrics
 import os
 import pandas as pd
+import refdata
+import seating
 import secrets
 import string
+import threading
+import time
 import update_data
 
 
@@ -36,9 +56,6 @@ app = Flask(__name__)
 app.jinja_env.filters.pop("attr", None)
 app.jinja_env.autoescape = True
 app.secret_key = secrets.token_hex(16)
-table: list[dict] = []
-dates: list[str] = []
-slots: list[int] = []
 
 template_paths = [
     os.path.join(".", "templates"),
@@ -47,10 +64,141 @@ template_paths = [
 
 app.jinja_env.loader = FileSystemLoader(template_paths)
 
-app.before_request(check_login)
+SEATS_PER_PAGE = 60
+MAX_FORMS = 8
+
+
+@app.before_request
+def start_timer() -> None:
+    g.metrics = (time.perf_counter(),
+                 metrics.route.set(request.url_rule.rule
+                                   if request.url_rule else "unmatched"),
+                 metrics.queries.set([0]))
+
+
+@app.after_request
+def record_status(response: Response) -> Response:
+    g.status = response.status_code
+    return response
+
+
+@app.teardown_request
+def record_request(_exception: Optional[BaseException]) -> None:
+    if (started := g.pop("metrics", None)) is None:
+        return
+
+    start, route, queries = started
+    labels = {"route": metrics.route.get(), "method": request.method}
+    metrics.observe("http_request_duration_seconds",
+                    time.perf_counter() - start,
+                    status=str(g.pop("status", 500)), **labels)
+    metrics.observe("db_queries_per_request", metrics.queries.get()[0],
+                    **labels)
+    metrics.queries.reset(queries)
+    metrics.route.reset(route)
+
 
+def _start_render(_app: Flask, template: Template, context: dict,
+                  **_extra: object) -> None:
+    g.render_start = time.perf_counter()
 
-app.route("/login", methods=["GET", "POST"])(nocache(login))
+
+def _end_render(_app: Flask, template: Template, context: dict,
+                **_extra: object) -> None:
+    if (start := g.pop("render_start", None)) is not None:
+        metrics.observe("template_render_duration_seconds",
+                        time.perf_counter() - start,
+                        route=metrics.route.get(),
+                        template=template.name or "<template>")
+
+
+before_render_template.connect(_start_render, app)
+template_rendered.connect(_end_render, app)
+
+app.before_request(check_login)
+
+_pool: Optional[db_pool.ConnectionPool] = None
+_pool_owner: Optional[Connection] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> db_pool.ConnectionPool:
+    global _pool, _pool_owner
+    with _pool_lock:
+        if _pool is None or _pool_owner is not sql.db_connector:
+            if _pool:
+                _pool.close()
+            _pool = db_pool.ConnectionPool(db_pool.connect_with(
+                **db_pool.login_settings(sql.db_connector), local_infile=True
+            ))
+            _pool_owner = sql.db_connector
+            _migrate(_pool)
+        return _pool
+
+
+def _migrate(pool: db_pool.ConnectionPool) -> None:
+    """
+    Brings the hall plan tables of a newly logged in database up to
+    date, building the roster of a plan stored before it existed.
+    """
+    db_connector = pool.acquire()
+    try:
+        with db_connector.cursor() as cursor:
+            create_hallplan(db_connector, cursor)
+            exam_roster.backfill(db_connector, cursor)
+    finally:
+        pool.release(db_connector)
+
+
+@app.before_request
+def open_pool() -> None:
+    if sql.db_connector:
+        _get_pool()
+
+
+def connection() -> tuple[Connection, Cursor]:
+    """
+    Returns the pooled connection and cursor of the current request,
+    acquiring them on first use.
+    """
+    if "db_connector" not in g:
+        g.pool = _get_pool()
+        g.db_connector = g.pool.acquire()
+        g.cursor = metrics.TimedCursor(g.db_connector.cursor())
+    return g.db_connector, g.cursor
+
+
+@app.teardown_appcontext
+def release_connection(_exception: Optional[BaseException]) -> None:
+    if (db_connector := g.pop("db_connector", None)) is not None:
+        g.pop("cursor").close()
+        g.pop("pool").release(db_connector)
+
+
+def _new_login(view: Callable[..., Response | str]
+               ) -> Callable[..., Response | str]:
+    """
+    Gives the browser session a new identity whenever ``view`` is used,
+    so that no page is revalidated across logins.
+    """
+    @wraps(view)
+    def wrapper(*args: object, **kwargs: object) -> Response | str:
+        session.pop("login", None)
+        return view(*args, **kwargs)
+    return wrapper
+
+
+app.route("/login", methods=["GET", "POST"])(nocache(_new_login(login)))
+
+
+@app.route("/metrics")
+def metrics_page() -> tuple[str, int, dict[str, str]]:
+    gauges = {}
+    if _pool:
+        gauges = {f"db_pool_{name}": value
+                  for name, value in _pool.stats().items()}
+    return (metrics.render(gauges), 200,
+            {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
 
 
 @app.route("/home")
@@ -67,7 +215,6 @@ app.route("/about")(about)
 
 @app.route("/upload")
 def upload() -> str:
-    table.clear()
     return render_template("./upload.html")
 
 
@@ -77,82 +224,162 @@ def upload_hallplan() -> Response | str:
         return render_template("./upload.html", action="/upload/hallplan",
                                hallplan=True)
 
-    table.clear()
     if not sql.db_connector or not sql.cursor:
         return render_template("./failed.html",
                                reason="Not logged in properly!")
 
-    __slots = request.files["slots"]
-    process_slot(sql.db_connector, sql.cursor, __slots)
-    if plan_sheet := request.files.get("plan"):
-        headers = [
-            "StudentID",
-            "Date",
-            "SlotNo",
-            "CourseCode",
-            "ClassID",
-            "Seat"
-        ]
-        plan = pd.read_excel(plan_sheet, sheet_name="plan",
-                             parse_dates=["Date"],
-                             date_format="%d/%m/%Y",
-                             names=headers,
-                             engine="openpyxl")
-        put_attendance(sql.db_connector, sql.cursor, plan=plan)
-
-    else:
+    if not (plan_sheet := request.files.get("plan")):
         return render_template("./upload.html", action="/upload/hallplan",
                                hallplan=True,
                                error_message="No plan uploaded!")
+
+    headers = [
+        "StudentID",
+        "Date",
+        "SlotNo",
+        "CourseCode",
+        "ClassID",
+        "Seat"
+    ]
+    try:
+        plan = ingest.read_sheet(plan_sheet, "plan", headers,
+                                 dtypes={"StudentID": "uint32",
+                                         "SlotNo": "uint8",
+                                         "ClassID": "uint32",
+                                         "Seat": "uint8"},
+                                 dates=["Date"])
+        db_connector, cursor = connection()
+        process_slot(db_connector, cursor, request.files["slots"])
+    except ValueError as exception:
+        return render_template("./upload.html", action="/upload/hallplan",
+                               hallplan=True, error_message=str(exception))
+    put_attendance(db_connector, cursor, plan=plan,
+                   local_infile=bool(request.form.get("local_infile")))
     return redirect(url_for("index"))
 
 
-@app.route("/download", methods=["GET", "POST"])
-def download() -> str:
+@app.route("/upload/invigilators", methods=["GET", "POST"])
+def upload_invigilators() -> tuple[Response, int, dict[str, str]] \
+        | Response | str:
     if request.method == "GET":
-        slots = fetch_data.get_slots(sql.cursor)
+        return render_template("./upload.html",
+                               action="/upload/invigilators",
+                               invigilators=True)
+
+    if not sql.db_connector:
+        return render_template("./failed.html",
+                               reason="Not logged in properly!")
+
+    if not (sheet := request.files.get("invigilators")):
+        return render_template("./upload.html",
+                               action="/upload/invigilators",
+                               invigilators=True,
+                               error_message="No invigilators uploaded!")
+
+    job = jobs.submit(partial(_invigilate, _get_pool(),
+                              invigilators=io.BytesIO(sheet.read())))
+    location = url_for("hallplan_job", job_id=job.id)
+    if _wants_json():
+        return jsonify(job.to_dict()), 202, {"Location": location}
+    return redirect(location, 303)
+
+
+def _login() -> str:
+    """
+    Identifies the login of the browser session.
+    """
+    return session.setdefault("login", secrets.token_hex(8))
+
+
+def _plan_version() -> Optional[int]:
+    if not sql.db_connector:
+        return None
+    _, cursor = connection()
+    return hallplan_cache.version(cursor)
+
+
+def _presence_version() -> Optional[int]:
+    if not sql.db_connector:
+        return None
+    _, cursor = connection()
+    return hallplan_cache.version(cursor, "presence")
+
+
+def _see_form(endpoint: str) -> Response:
+    """
+    Keeps the form POSTed to ``endpoint`` in the session, under a key
+    hashed from its fields, and redirects to a GET of that key. The
+    filters stay out of the URL, while the page they select can be
+    revalidated like any other GET.
+    """
+    form = request.form.to_dict()
+    key = hashlib.blake2b(repr(sorted(form.items())).encode(),
+                          digest_size=8).hexdigest()
+    forms = session.setdefault("forms", {})
+    forms.pop(key, None)
+    forms[key] = form
+    while len(forms) > MAX_FORMS:
+        forms.pop(next(iter(forms)))
+    session.modified = True
+    return redirect(url_for(endpoint, form=key), 303)
+
+
+def _seen_form() -> Optional[dict[str, str]]:
+    """
+    Returns the form kept by :func:`_see_form` for the current GET.
+    """
+    return session.get("forms", {}).get(request.args.get("form", ""))
+
+
+@app.route("/download", methods=["GET", "POST"])
+@http_cache.conditional(_login, _plan_version)
+def download() -> Response | str:
+    if not sql.cursor:
+        return render_template("./failed.html",
+                               reason="Not logged in properly!")
+
+    if request.method == "POST":
+        return _see_form("download")
+
+    _, cursor = connection()
+    if not (form := _seen_form()):
+        slots = fetch_data.get_slots(cursor)
         slot_min = slots[0]["no"]
         slot_max = slots[-1]["no"]
-        schools = tuple(school["name"] for school in get_schools(sql.cursor))
+        schools = tuple(school["name"] for school in get_schools(cursor))
         return render_template("hall_details.html", action="/download",
                                slot_min=slot_min, slot_max=slot_max,
                                schools=schools, proceed="Download", date=True)
 
-    if not sql.cursor:
-        return render_template("./failed.html",
-                               reason="Not logged in properly!")
-
-    school = request.form["school"]
-    school_id = get_school_id(sql.cursor, school=school)
-    building_id = get_building_id(sql.cursor, school_id=school_id)
-    slot_no = int(request.form["slot_no"])
-    if room_no := request.form.get("room_no"):
+    school = form["school"]
+    building_id = refdata.building_id(cursor, school=school)
+    slot_no = int(form["slot_no"])
+    if room_no := form.get("room_no"):
         room_no = int(room_no)
     else:
         room_no = None
-        _section = request.form["section"]
+        _section = form["section"]
 
-    date = request.form.get("date")
+    date = form.get("date")
     if not date:
         date = datetime.today()
     else:
         date = datetime.strptime(date, "%Y-%m-%d")
 
-    students = fetch_data.get_attendance(sql.cursor, fmt="pandas")
-    cls = get_classes(sql.cursor, building_id=building_id[0], room_no=room_no)
-    if not cls:
+    cls_id = None
+    if room_no and not (cls_id := refdata.class_id(cursor, building_id,
+                                                   room_no)):
         return render_template(
             "./failed.html",
             reason=f"Invalid Room No. {room_no} for {school}"
         )
 
-    cls_id = cls[0]["id"]
+    students = fetch_data.get_attendance(cursor, fmt="pandas",
+                                         date=date.date(), slot_no=slot_no,
+                                         class_id=cls_id)
     assert isinstance(students, pd.DataFrame)
-
-    students = students.query(
-        "Date.dt.date == @date.date() and ClassID == @cls_id "
-        "and SlotNo == @slot_no"
-    )
+    if not room_no:
+        students = _in_section(students, _section)
     if students.empty:
         return render_template(
             "./failed.html",
@@ -178,128 +405,247 @@ def to_fmt(date: datetime) -> str:
     return date.strftime("%d/%m/%Y")
 
 
-def _hallplan(plan: pd.DataFrame) -> None:
-    for date_slot, data in plan.groupby(["Date", "SlotNo"]):
-        date, slot_no = date_slot
-        section_groups = data.groupby(["Year", "Degree", "Stream", "Section"])
-        for _section, cls_stds in section_groups:
-            year, degree, stream, section = _section
-            description = f"{year} {degree} "
-            if stream != "NULL":
-                description += f"({stream}) "
-
-            description += f"{section} "
-            halls = cls_stds.groupby("RoomNo").agg(
-                _min=("RegNo", "min"),
-                _max=("RegNo", "max")
-            ).sort_values("_min")
-
-            table.append({
-                "date": to_fmt(date),
-                "slot_no": int(slot_no),
-                "course_code": cls_stds.iloc[0]["CourseCode"],
-                "description": description,
-                "halls": {hall: f"{reg_no['_min']}-{reg_no['_max']}"
-                          for hall, reg_no in halls.iterrows()}
-            })
-    slots.extend(plan["SlotNo"].unique().tolist())
-    dates.extend(plan["Date"].apply(to_fmt).unique().tolist())
+def _in_section(students: pd.DataFrame, _section: str) -> pd.DataFrame:
+    _year, degree, *stream, section = _section.split()
+    year = int(_year)
+    degree = degree.title()
+    section = section.upper()
+    _stream = "".join(stream) if stream else "NULL"
+    return students.query("Year == @year and Degree == @degree "
+                          "and Stream == @_stream "
+                          "and Section == @section")
+
+
+def _roster(students: pd.DataFrame) -> list[tuple]:
+    """
+    Returns the seat, name, register no., course code, class and presence
+    of ``students``, by hall and seat, as plain tuples.
+    """
+    students = students.sort_values(["ClassID", "Seat"])
+    return list(zip(students["Seat"].tolist(), students["Name"].tolist(),
+                    students["RegNo"].tolist(),
+                    students["CourseCode"].tolist(),
+                    students["ClassID"].tolist(),
+                    students["Present"].tolist()))
+
+
+def _roster_page(students: pd.DataFrame, first_seat: int
+                 ) -> tuple[list[tuple], int]:
+    """
+    Returns the :func:`_roster` of the students seated from ``first_seat``
+    on, ``SEATS_PER_PAGE`` seats of every hall, along with the last seat
+    taken.
+    """
+    page = students[students["Seat"].between(
+        first_seat, first_seat + SEATS_PER_PAGE - 1
+    )]
+    return _roster(page), int(students["Seat"].max())
+
+
+def _usage_report(plan: pd.DataFrame,
+                  halls: pd.DataFrame) -> dict[str, object]:
+    usage = hall_usage(plan, halls)
+    return {
+        "violations": len(seating.check(plan)),
+        "halls_used": int(usage["HallsUsed"].sum()),
+        "utilization": float(usage["Students"].sum()
+                             / max(usage["Capacity"].sum(), 1)),
+        "groups": [{
+            "date": date.strftime("%d/%m/%Y"),
+            "slot_no": slot_no,
+            "halls": n,
+            "halls_used": used,
+            "utilization": round(utilization, 4)
+        } for date, slot_no, n, used, utilization in zip(
+            usage["Date"], usage["SlotNo"].tolist(), usage["Halls"].tolist(),
+            usage["HallsUsed"].tolist(), usage["Utilization"].tolist()
+        )]
+    }
+
+
+def _assign_invigilators(db_connector: Connection, cursor: Cursor,
+                         sheet: io.BytesIO) -> int:
+    """
+    Assigns invigilators to every hall of the stored plan, replacing
+    those assigned before. Returns the number of duties assigned.
+    """
+    plan = fetch_data.get_attendance(cursor, fmt="pandas")
+    assert isinstance(plan, pd.DataFrame)
+    invigilators = assign_invigilators(plan, process_invigilators(sheet))
+    put_invigilators(db_connector, cursor, plan, invigilators)
+    return len(invigilators)
+
+
+def _invigilate(pool: db_pool.ConnectionPool, job: jobs.Job, *,
+                invigilators: io.BytesIO) -> None:
+    db_connector = pool.acquire()
+    cursor = metrics.TimedCursor(db_connector.cursor())
+    try:
+        job.stage = "invigilators"
+        job.report = {"invigilators": _assign_invigilators(
+            db_connector, cursor, invigilators
+        )}
+    finally:
+        cursor.close()
+        pool.release(db_connector)
+
+
+def _generate(pool: db_pool.ConnectionPool, job: jobs.Job, /, *,
+              slots: io.BytesIO, schedules: io.BytesIO,
+              classrooms: io.BytesIO,
+              invigilators: Optional[io.BytesIO] = None,
+              incremental: bool = False,
+              strategy: str = "spread", repair: bool = False,
+              local_infile: bool = False) -> None:
+    db_connector = pool.acquire()
+    cursor = metrics.TimedCursor(db_connector.cursor())
+    try:
+        job.stage = "slots"
+        _slots = process_slot(db_connector, cursor, slots)
+        job.stage = "schedules"
+        _schedules = process_schedule(cursor, schedules,
+                                      slots=_slots, campus_id=2)
+        job.stage = "halls"
+        halls = process_hall(cursor, classrooms, building_id=3)
+        job.stage = "allocation"
+        if incremental:
+            plan = replan_hallplan(
+                db_connector, cursor, schedules=_schedules, halls=halls,
+                progress=job.advance, strategy=strategy, repair=repair
+            )
+        else:
+            plan = generate_hallplan(
+                db_connector, cursor, schedules=_schedules, halls=halls,
+                progress=job.advance, strategy=strategy, repair=repair,
+                local_infile=local_infile
+            )
+        job.report = _usage_report(plan, halls)
+        if invigilators:
+            job.stage = "invigilators"
+            job.report["invigilators"] = _assign_invigilators(
+                db_connector, cursor, invigilators
+            )
+        if not incremental:
+            job.stage = "summary"
+            hallplan_cache.put(hallplan_cache.version(cursor),
+                               summarize_hallplan(plan))
+    finally:
+        cursor.close()
+        pool.release(db_connector)
+
+
+def _wants_json() -> bool:
+    return request.accept_mimetypes.best_match(
+        ["text/html", "application/json"]
+    ) == "application/json"
+
+
+@app.route("/hallplan/jobs/<job_id>")
+def hallplan_job(job_id: str) -> Response | tuple[Response, int] | str:
+    if not (job := jobs.get(job_id)):
+        if _wants_json():
+            return jsonify(error="No such job"), 404
+        return render_template("./failed.html", reason="No such job"), 404
+    if _wants_json():
+        return jsonify(job.to_dict())
+    return render_template("./job.html", job=job)
 
 
 @app.route("/hallplan", methods=["GET", "POST"])
-def hallplan() -> str:
+@http_cache.conditional(_login, _plan_version)
+def hallplan() -> tuple[Response, int, dict[str, str]] | Response | str:
     if not (sql.db_connector and sql.cursor):
         return render_template("./failed.html",
                                reason="Unable to authenticate!")
 
-    if request.method == "GET" and not table:
-        plan = fetch_data.get_attendance(sql.cursor, fmt="pandas")
-        if isinstance(plan, pd.DataFrame):
-            _hallplan(plan)
-
-    if table:
-        _date = request.form.get("date")
-        _slot = request.form.get("slot")
-        t1 = table
-        if _date:
-            t1 = [t for t in t1 if str(t["date"]) == _date]
-        if _slot:
-            t1 = [t for t in t1 if str(t["slot_no"]) == _slot]
-        return render_template("./hallplan.html", table=t1,
-                               dates=dates, slots=slots,
-                               date=_date, slot=_slot)
-
-    if request.method == "POST":
+    if request.method == "POST" and request.files:
         if not (request.files.get("slots") and request.files.get("schedules")
                 and request.files.get("classrooms")):
             return render_template("./upload.html",
                                    error_message="Please upload all 3 files")
 
-        __slots = request.files["slots"]
-        _schedules = request.files["schedules"]
-        _classrooms = request.files["classrooms"]
-        _slots = process_slot(sql.db_connector, sql.cursor, __slots)
-        schedules = process_schedule(sql.cursor, _schedules,
-                                     slots=_slots, campus_id=2)
-        classrooms = process_hall(sql.cursor, _classrooms, building_id=3)
-        plan = generate_hallplan(sql.db_connector, sql.cursor,
-                                 schedules=schedules, halls=classrooms)
-        _hallplan(plan)
-    return render_template("./hallplan.html", table=table,
-                           dates=dates, slots=slots)
+        if (strategy := request.form.get("strategy", "spread")) \
+                not in STRATEGIES:
+            return render_template("./upload.html",
+                                   error_message="Unknown seating strategy")
+
+        sheets = {name: io.BytesIO(request.files[name].read())
+                  for name in ("slots", "schedules", "classrooms",
+                               "invigilators")
+                  if request.files.get(name)}
+        job = jobs.submit(partial(
+            _generate, _get_pool(), **sheets,
+            incremental=bool(request.form.get("incremental")),
+            strategy=strategy, repair=bool(request.form.get("repair")),
+            local_infile=bool(request.form.get("local_infile"))
+        ))
+        location = url_for("hallplan_job", job_id=job.id)
+        if _wants_json():
+            return jsonify(job.to_dict()), 202, {"Location": location}
+        return redirect(location, 303)
+
+    _, cursor = connection()
+    version = hallplan_cache.version(cursor)
+    if not (summary := hallplan_cache.get(version)):
+        plan = fetch_data.get_attendance(cursor, fmt="columnar")
+        assert isinstance(plan, pd.DataFrame)
+        summary = hallplan_cache.put(version, summarize_hallplan(plan))
+
+    _date = request.form.get("date")
+    _slot = request.form.get("slot")
+    return render_template("./hallplan.html",
+                           table=summary.view(_date, _slot),
+                           dates=summary.dates, slots=summary.slots,
+                           date=_date, slot=_slot)
 
 
 @app.route("/attendance", methods=["GET", "POST"])
+@http_cache.conditional(_login, _plan_version, _presence_version)
 def attendance() -> Response | str:
     if not sql.cursor:
         raise ValueError("Not logged in properly!")
 
-    user, _ = sql.get_user(sql.cursor)
-    if request.method == "GET":
-        slots = fetch_data.get_slots(sql.cursor)
+    if request.method == "POST" and not request.form.get("export"):
+        return _see_form("attendance")
+
+    _, cursor = connection()
+    user, _ = sql.get_user(cursor)
+    form = request.form if request.method == "POST" else _seen_form()
+    if not form:
+        slots = fetch_data.get_slots(cursor)
         slot_min = slots[0]["no"]
         slot_max = slots[-1]["no"]
-        schools = tuple(school["name"] for school in get_schools(sql.cursor))
+        schools = tuple(school["name"] for school in get_schools(cursor))
         return render_template("hall_details.html", slot_min=slot_min,
                                slot_max=slot_max, schools=schools, user=user)
 
-    school = request.form["school"]
-    school_id = get_school_id(sql.cursor, school=school)
-    building_id = get_building_id(sql.cursor, school_id=school_id)
-    slot_no = int(request.form["slot_no"])
-    if room_no := request.form.get("room_no"):
+    school = form["school"]
+    building_id = refdata.building_id(cursor, school=school)
+    slot_no = int(form["slot_no"])
+    if room_no := form.get("room_no"):
         room_no = int(room_no)
     else:
         room_no = None
-        _section = request.form["section"]
+        _section = form["section"]
 
-    date = request.form.get("date")
+    date = form.get("date")
     if not date:
         date = datetime.today()
     else:
         date = datetime.strptime(date, "%Y-%m-%d")
-    students = fetch_data.get_attendance(sql.cursor, fmt="pandas")
-    cls = get_classes(sql.cursor, building_id=building_id[0], room_no=room_no)
-    if not cls:
+    cls_id = None
+    if room_no and not (cls_id := refdata.class_id(cursor, building_id,
+                                                   room_no)):
         return render_template(
             "./failed.html",
             reason=f"Invalid Room No. {room_no} for {school}"
         )
-    cls_id = cls[0]["id"]
+    students = fetch_data.get_attendance(cursor, fmt="pandas",
+                                         date=date.date(), slot_no=slot_no,
+                                         class_id=cls_id)
     assert isinstance(students, pd.DataFrame)
-    students = students.query(
-        "Date.dt.date == @date.date() and ClassID == @cls_id "
-        "and SlotNo == @slot_no"
-    )
     if not room_no:
-        year, degree, *stream, section = _section.split()
-        year = int(year)
-        degree = degree.title()
-        section = section.upper()
-        _stream = "".join(stream) if stream else "NULL"
-        students = students.query("Year == @year and Degree == @degree "
-                                  "and Stream == @_stream "
-                                  "and Section == @section")
+        students = _in_section(students, _section)
 
     if students.empty:
         return render_template(
@@ -308,36 +654,56 @@ def attendance() -> Response | str:
                    f"at slot {slot_no} on {to_fmt(date)}"
         )
     view = True
-    if request.form.get("action") == "proceed":
+    if form.get("action") == "proceed":
         view = False
 
+    if request.form.get("export"):
+        return jsonify(students=_roster(students))
+
+    first_seat = max(int(form.get("first_seat") or 1), 1)
+    records, last_seat = _roster_page(students, first_seat)
     return render_template(
         "./attendance.html", view=view, date=to_fmt(date), slot_no=slot_no,
-        room_no=room_no, school=school, students=students.iterrows()
+        room_no=room_no, school=school, students=records,
+        form=form, first_seat=first_seat,
+        seats_per_page=SEATS_PER_PAGE, last_seat=last_seat
     )
 
 
+def _presence(form: Mapping[str, str]
+              ) -> Optional[tuple[datetime, int, dict[int, str]]]:
+    """
+    Reads the date, slot and per-hall presence strings of an
+    ``/update`` form, or ``None`` if any of them is malformed.
+    """
+    try:
+        date = datetime.strptime(form["date"], "%d/%m/%Y")
+        slot_no = int(form["slot_no"])
+        halls = json.loads(form["presence"])
+        if not isinstance(halls, dict):
+            return None
+        presence = {int(class_id): seats
+                    for class_id, seats in halls.items()}
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not all(isinstance(seats, str) and set(seats) <= set("01-")
+               for seats in presence.values()):
+        return None
+    return date, slot_no, presence
+
+
 @app.route("/update", methods=["POST"])
-def update() -> Response:
+def update() -> Response | tuple[str, int]:
     if not sql.db_connector or not sql.cursor:
         raise ValueError("Not logged in properly!")
 
-    date = datetime.strptime(request.form["date"], "%d/%m/%Y").date()
-    slot_no = int(request.form["slot_no"])
-    presentees = ast.literal_eval(request.form["presentees"])
-    absentees = ast.literal_eval(request.form["absentees"])
-
-    assert all(isinstance(presentee, int | str) for presentee in presentees)
-    update_data.update_attendances(sql.db_connector, sql.cursor, [
-        (True, date, slot_no, presentee)
-        for presentee in presentees
-    ])
-
-    assert all(isinstance(absentee, int | str) for absentee in absentees)
-    update_data.update_attendances(sql.db_connector, sql.cursor, [
-        (False, date, slot_no, absentee)
-        for absentee in absentees
-    ])
+    if not (marks := _presence(request.form)):
+        return render_template("./failed.html",
+                               reason="Invalid attendance update!"), 400
+    date, slot_no, halls = marks
+    db_connector, cursor = connection()
+    update_data.update_presence(db_connector, cursor, date=date.date(),
+                                slot_no=slot_no, halls=halls)
     return redirect(url_for("index"))
 
 
@@ -411,7 +777,7 @@ def remove_user() -> Response | str:
                            reason="Not logged in properly!")
 
 
-app.route("/logout")(logout)
+app.route("/logout")(_new_login(logout))
 
 
 app.errorhandler(404)(page_not_found)
@@ -33,6 +33,7 @@ def create_hallplan(db_connector: Connection, cursor: Cursor) -> None:
     - **``slots``**: Maps slot number with start and end time of the slot.
     - **``attendance``**: Stores attendance information for each student.
     - **``invigilator``**: Stores invigilator with date, slot number.
+    - **``exam_roster``**: Attendance pre-joined with students and rooms.
 
     Examples
     ========
@@ -115,8 +116,55 @@ def create_hallplan(db_connector: Connection, cursor: Cursor) -> None:
                    FOREIGN KEY(`class_id`) REFERENCES `classes`(`id`)
                    ON UPDATE CASCADE ON DELETE RESTRICT,
                    UNIQUE(`date`, `class_id`, `faculty_id`),
+                   INDEX(`faculty_id`, `date`),
                    FOREIGN KEY(`date`, `slot_no`)
                    REFERENCES `attendance`(`date`, `slot_no`)
                    ON UPDATE CASCADE ON DELETE RESTRICT
     )""")
+    """
+    Functional Dependencies
+    =======================
+    - `date`, `slot_no`, `class_id`, `seat` \u2192 `student_id`, ...
+    - `date`, `slot_no`, `student_id` \u2192 `class_id`, `seat`, ...
+
+    Derived from `attendance`, `classes`, `section_student_details`
+    and `degrees` by :func:`exam_roster.refresh`.
+    """
+    cursor.execute("""CREATE TABLE IF NOT EXISTS `exam_roster` (
+                   `date` DATE NOT NULL,
+                   `slot_no` TINYINT UNSIGNED NOT NULL,
+                   `class_id` MEDIUMINT UNSIGNED NOT NULL,
+                   `seat` TINYINT UNSIGNED NOT NULL,
+                   `student_id` INT UNSIGNED NOT NULL,
+                   `room_no` SMALLINT UNSIGNED NOT NULL,
+                   `course_code` VARCHAR(10) NOT NULL,
+                   `section_id` INT UNSIGNED NOT NULL,
+                   `degree` VARCHAR(50) NOT NULL,
+                   `stream` VARCHAR(50),
+                   `year` TINYINT UNSIGNED NOT NULL,
+                   `section` VARCHAR(10) NOT NULL,
+                   `reg_no` VARCHAR(15) NOT NULL,
+                   `name` VARCHAR(100) NOT NULL,
+                   `is_present` BOOLEAN NOT NULL,
+                   PRIMARY KEY(`date`, `slot_no`, `class_id`, `seat`),
+                   UNIQUE(`date`, `slot_no`, `student_id`),
+                   INDEX(`section_id`, `date`, `slot_no`),
+                   FOREIGN KEY(`date`, `slot_no`, `student_id`)
+                   REFERENCES `attendance`(`date`, `slot_no`, `student_id`)
+                   ON UPDATE CASCADE ON DELETE CASCADE
+    )""")
+    """
+    Counts the writes of the `plan` and of its `presence` marks,
+    stamped by :func:`hallplan_cache.stamp`.
+    """
+    cursor.execute("""CREATE TABLE IF NOT EXISTS `plan_versions` (
+                   `name` VARCHAR(10) NOT NULL PRIMARY KEY,
+                   `version` BIGINT UNSIGNED NOT NULL DEFAULT 0
+    )""")
+    cursor.execute("""SELECT `name` FROM `plan_versions`""")
+    stamped = {row["name"] for row in cursor.fetchall()}
+    if missing := [(name,) for name in ("plan", "presence")
+                   if name not in stamped]:
+        cursor.executemany("""INSERT INTO `plan_versions` (`name`)
+                           VALUES (%s)""", missing)
     db_connector.commit()
@@ -0,0 +1,110 @@
+# Copyright 2025 Harikrishna Srinivasan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from benchmarks import synthetic
+from benchmarks.scenarios import SCENARIOS, Workload
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+"""
+Runs the scenarios, comparing their median times with the baseline.
+
+    python -m benchmarks [--repeat N] [--tolerance 1.25] [--scale 1.0]
+                         [--save] [scenario ...]
+
+Exits with status 1 if any scenario is slower than its baseline
+by more than ``--tolerance``; ``--save`` records the new baseline.
+"""
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def measure(work: Workload, name: str, repeat: int) -> list[float]:
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        reset, run = SCENARIOS[name](work)
+        for _ in range(repeat + 1):
+            if reset:
+                reset()
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+    return timings[1:]
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("scenarios", nargs="*",
+                        help=f"scenarios to run, of {', '.join(SCENARIOS)}; "
+                             "all by default")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="timed runs per scenario, after one warm-up")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="scales the students and halls of the "
+                             "university")
+    parser.add_argument("--tolerance", type=float, default=1.25,
+                        help="slowdown over the baseline deemed a regression")
+    parser.add_argument("--save", action="store_true",
+                        help="record the medians as the new baseline")
+    args = parser.parse_args(argv)
+    if unknown := set(args.scenarios) - SCENARIOS.keys():
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    try:
+        with open(BASELINE) as file:
+            baseline = json.load(file)
+    except FileNotFoundError:
+        baseline = {}
+    medians = baseline.get(str(args.scale), {}) if args.save else {}
+    expected = baseline.get(str(args.scale), {})
+
+    work = Workload(synthetic.University(
+        students=round(30000 * args.scale),
+        halls=max(round(250 * args.scale), 1)
+    ))
+    regressed = []
+    for name in args.scenarios or SCENARIOS:
+        timings = measure(work, name, args.repeat)
+        median = statistics.median(timings)
+        line = f"{name:<28} median {median:8.4f}s  min {min(timings):8.4f}s"
+        if name in expected:
+            ratio = median / expected[name]
+            line += f"  {ratio:5.2f}x baseline"
+            if ratio > args.tolerance:
+                regressed.append(name)
+                line += "  REGRESSED"
+        print(line)
+        medians[name] = median
+
+    if args.save:
+        baseline[str(args.scale)] = medians
+        with open(BASELINE, "w") as file:
+            json.dump(baseline, file, indent=4, sort_keys=True)
+            file.write("\n")
+        print(f"Baseline saved to {BASELINE}")
+    elif regressed:
+        print(f"Regressions: {', '.join(regressed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,296 @@
+# Copyright 2025 Harikrishna Srinivasan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import count
+from typing import Optional
+import datetime
+import numpy as np
+import pymysql.cursors
+import pymysql.err
+import re
+import sqlite3
+
+"""
+An in-memory SQLite database behind the subset of the PyMySQL
+connection and cursor interface the hall plan modules use.
+
+Queries are translated from the MySQL dialect on the fly:
+placeholders, ``<=>``, inline ``INDEX`` definitions, multi-table
+``UPDATE ... JOIN ... USING`` and the ``CONCAT``, ``LPAD``, ``MOD``
+and ``CHAR_LENGTH`` functions.
+"""
+
+SCHEMA = (
+    """CREATE TABLE `degrees` (
+    `name` VARCHAR(50) NOT NULL PRIMARY KEY,
+    `duration` TINYINT UNSIGNED NOT NULL
+    )""",
+    """CREATE TABLE `classes` (
+    `id` MEDIUMINT UNSIGNED NOT NULL PRIMARY KEY,
+    `building_id` SMALLINT UNSIGNED NOT NULL,
+    `room_no` SMALLINT UNSIGNED NOT NULL,
+    UNIQUE(`building_id`, `room_no`)
+    )""",
+    """CREATE TABLE `periods` (
+    `id` TINYINT UNSIGNED NOT NULL PRIMARY KEY,
+    `start_time` TIME NOT NULL,
+    `end_time` TIME NOT NULL,
+    `is_break` BOOLEAN NOT NULL DEFAULT 0
+    )""",
+    """CREATE TABLE `section_student_details` (
+    `student_id` INT UNSIGNED NOT NULL PRIMARY KEY,
+    `section_id` INT UNSIGNED NOT NULL,
+    `degree` VARCHAR(50) NOT NULL,
+    `stream` VARCHAR(50),
+    `year` TINYINT UNSIGNED NOT NULL,
+    `section` VARCHAR(10) NOT NULL,
+    `campus_id` TINYINT UNSIGNED NOT NULL,
+    `join_year` SMALLINT UNSIGNED NOT NULL,
+    `programme_id` SMALLINT UNSIGNED NOT NULL,
+    `roll_no` SMALLINT UNSIGNED NOT NULL,
+    `name` VARCHAR(100) NOT NULL
+    )""",
+    """CREATE INDEX `SSD_programme`
+    ON `section_student_details`(`degree`, `stream`, `year`)"""
+)
+
+_INDEX = re.compile(r",\s*(?:UNIQUE\s+)?(?:INDEX|KEY)\s*\([^)]*\)",
+                    re.IGNORECASE)
+
+
+def _translate(query: str) -> str:
+    query = _INDEX.sub("", query)
+    return query.replace("<=>", " IS ").replace("%s", "?") \
+        .replace("%%", "%")
+
+
+_JOINED_UPDATE = re.compile(
+    r"\s*UPDATE\s+(`\w+`)\s+(LEFT\s+)?JOIN\s+(`\w+`)"
+    r"\s+USING\s*\(([^)]*)\)"
+    r"\s+SET\s+(.*?)\s+WHERE\s+(.*)", re.IGNORECASE | re.DOTALL
+)
+
+
+def _assignments(text: str) -> Iterator[str]:
+    """
+    Splits the ``SET`` list of an ``UPDATE`` at its top-level commas.
+    """
+    depth = start = 0
+    for pos, char in enumerate(text):
+        depth += {"(": 1, ")": -1}.get(char, 0)
+        if char == "," and not depth:
+            yield text[start:pos].strip()
+            start = pos + 1
+    yield text[start:].strip()
+
+
+@lru_cache(maxsize=256)
+def _statements(query: str) -> tuple[tuple[str, Optional[int]], ...]:
+    """
+    Translates ``query`` into SQLite statements, each with the number
+    of leading parameters it takes, or ``None`` for all of them.
+
+    SQLite updates one table per statement, so a multi-table
+    ``UPDATE ... [LEFT] JOIN ... USING`` becomes an ``UPDATE ... FROM``
+    per assigned table, its placeholders numbered so that every statement
+    reads its values from the parameters of the whole query. The left
+    table of a ``LEFT JOIN`` is updated by rowid instead, so that its
+    rows without a match are updated too; its assignments may then only
+    read its own columns.
+    """
+    if not (match := _JOINED_UPDATE.fullmatch(query)):
+        return ((_translate(query), None),)
+
+    first, left, second, using, assignments, where = match.groups()
+    numbers = count(1)
+    assignments, where = (re.sub("%s", lambda _: f"?{next(numbers)}", text)
+                          for text in (assignments, where))
+    join = " AND ".join(f"{first}.{column}={second}.{column}"
+                        for column in map(str.strip, using.split(",")))
+    statements: list[tuple[str, Optional[int]]] = []
+    for assignment in _assignments(assignments):
+        table, value = assignment.split(".", 1)
+        if left and table == first:
+            statement = f"""UPDATE {first} SET {value}
+                        WHERE rowid IN (SELECT {first}.rowid FROM {first}
+                                        LEFT JOIN {second} ON {join}
+                                        WHERE {where})"""
+        else:
+            other = second if table == first else first
+            statement = f"""UPDATE {table} SET {value} FROM {other}
+                        WHERE {join} AND ({where})"""
+        statement = _translate(statement)
+        statements.append((statement, max(
+            map(int, re.findall(r"\?(\d+)", statement)), default=0
+        )))
+    return tuple(statements)
+
+
+def _lpad(value: object, width: int, pad: str) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value)
+    return value[:width] if len(value) >= width else value.rjust(width, pad)
+
+
+def _concat(*values: object) -> Optional[str]:
+    if any(value is None for value in values):
+        return None
+    return "".join(map(str, values))
+
+
+def _adapt(value: object) -> object:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, datetime.datetime):
+        return value.date().isoformat() \
+            if value.time() == datetime.time() else value.isoformat(" ")
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return value
+
+
+def _params(args: Optional[Sequence[object]]) -> tuple[object, ...]:
+    return tuple(map(_adapt, args or ()))
+
+
+@contextmanager
+def _errors() -> Iterator[None]:
+    """
+    Raises SQLite errors as the PyMySQL errors the callers catch.
+    """
+    try:
+        yield
+    except sqlite3.IntegrityError as exception:
+        raise pymysql.err.IntegrityError(*exception.args) from exception
+    except sqlite3.Error as exception:
+        raise pymysql.err.DatabaseError(*exception.args) from exception
+
+
+class Cursor:
+    """
+    A cursor returning rows as dicts, like PyMySQL's ``DictCursor``,
+    or as tuples when opened as an ``SSCursor``.
+    """
+    def __init__(self, connection: "Connection", *, as_dict: bool) -> None:
+        self.connection = connection
+        self._cursor = connection._db.cursor()
+        self._as_dict = as_dict
+        self.description: Optional[tuple] = None
+        self.rowcount = -1
+
+    def _row(self, row: tuple) -> dict[str, object] | tuple:
+        if self._as_dict:
+            return dict(zip((column[0] for column in self.description), row))
+        return row
+
+    def execute(self, query: str, args: Optional[Sequence[object]] = None
+                ) -> int:
+        params = _params(args)
+        self.rowcount = 0
+        with _errors():
+            for statement, count in _statements(query):
+                self._cursor.execute(statement, params[:count])
+                self.rowcount += self._cursor.rowcount
+        self.description = self._cursor.description
+        return max(self.rowcount, 0)
+
+    def executemany(self, query: str,
+                    args: Iterable[Sequence[object]]) -> int:
+        statements = _statements(query)
+        rows: Iterable[tuple[object, ...]] = map(_params, args)
+        if len(statements) > 1:
+            rows = list(rows)
+        self.rowcount = 0
+        with _errors():
+            for statement, count in statements:
+                self._cursor.executemany(
+                    statement, rows if count is None
+                    else (row[:count] for row in rows)
+                )
+                self.rowcount += self._cursor.rowcount
+        return max(self.rowcount, 0)
+
+    def fetchone(self) -> Optional[dict[str, object] | tuple]:
+        row = self._cursor.fetchone()
+        return None if row is None else self._row(row)
+
+    def fetchmany(self, size: int = 1) -> list[dict[str, object] | tuple]:
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self) -> list[dict[str, object] | tuple]:
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def __iter__(self) -> Iterator[dict[str, object] | tuple]:
+        return map(self._row, self._cursor)
+
+    def close(self) -> None:
+        self._cursor.close()
+
+    def __enter__(self) -> "Cursor":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class Connection:
+    """
+    An in-memory database holding the base tables of :data:`SCHEMA`.
+    """
+    def __init__(self) -> None:
+        self._db = sqlite3.connect(":memory:", check_same_thread=False)
+        self._db.create_function("CONCAT", -1, _concat, deterministic=True)
+        self._db.create_function("LPAD", 3, _lpad, deterministic=True)
+        self._db.create_function("MOD", 2, lambda a, b: a % b,
+                                 deterministic=True)
+        self._db.create_function("CHAR_LENGTH", 1, len, deterministic=True)
+        for statement in SCHEMA:
+            self._db.execute(statement)
+        self._db.commit()
+
+    def cursor(self, cursorclass: Optional[type] = None) -> Cursor:
+        return Cursor(self, as_dict=cursorclass in (
+            None, pymysql.cursors.DictCursor
+        ))
+
+    def commit(self) -> None:
+        self._db.commit()
+
+    def rollback(self) -> None:
+        self._db.rollback()
+
+    def ping(self, reconnect: bool = False) -> None:
+        pass
+
+    def close(self) -> None:
+        self._db.close()
+
+    def load(self, table: str, rows: Sequence[dict[str, object]]) -> None:
+        """
+        Inserts ``rows``, all having the same keys, into ``table``.
+        """
+        if not rows:
+            return
+        columns = list(rows[0])
+        self._db.executemany(
+            f"""INSERT INTO `{table}` ({", ".join(columns)})
+            VALUES ({", ".join("?" * len(columns))})""",
+            (_params([row[column] for column in columns]) for row in rows)
+        )
+        self._db.commit()
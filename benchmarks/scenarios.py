@@ -0,0 +1,224 @@
+# Copyright 2025 Harikrishna Srinivasan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from benchmarks import memdb, synthetic
+from collections.abc import Callable
+from functools import cached_property
+from itertools import cycle
+from typing import Optional
+import fetch_data
+import generate_hallplan
+import pandas as pd
+import refdata
+import seating
+import update_data
+
+"""
+The timed scenarios, one per pipeline stage.
+
+Every scenario is built once from a :class:`Workload` and returns
+``(reset, run)``: ``reset`` restores the database between runs,
+untimed, and ``run`` is the timed stage.
+"""
+
+Stage = tuple[Optional[Callable[[], None]], Callable[[], object]]
+
+SCENARIOS: dict[str, Callable[["Workload"], Stage]] = {}
+
+
+def scenario(name: str) -> Callable[[Callable[["Workload"], Stage]],
+                                    Callable[["Workload"], Stage]]:
+    def register(build: Callable[["Workload"], Stage]
+                 ) -> Callable[["Workload"], Stage]:
+        SCENARIOS[name] = build
+        return build
+    return register
+
+
+class Workload:
+    """
+    A synthetic university loaded into a fresh in-memory database,
+    with every pipeline stage's input computed on first use.
+    """
+    def __init__(self, university: synthetic.University) -> None:
+        self.university = university
+        self.db_connector = memdb.Connection()
+        self.cursor = self.db_connector.cursor()
+        university.load(self.db_connector)
+        refdata.stamp()
+
+    @cached_property
+    def slots(self) -> pd.DataFrame:
+        return generate_hallplan.process_slot(
+            self.db_connector, self.cursor,
+            synthetic.sheet(self.university.slots)
+        )
+
+    @cached_property
+    def schedules(self) -> pd.DataFrame:
+        return generate_hallplan.process_schedule(
+            self.cursor, synthetic.sheet(self.university.schedules),
+            self.slots
+        )
+
+    @cached_property
+    def halls(self) -> pd.DataFrame:
+        return generate_hallplan.process_hall(
+            self.cursor, synthetic.sheet(self.university.halls),
+            synthetic.BUILDING_ID
+        )
+
+    @cached_property
+    def plan(self) -> pd.DataFrame:
+        return generate_hallplan.allocate_seats(self.schedules, self.halls)
+
+    def clear(self) -> None:
+        for table in ("exam_roster", "attendance"):
+            self.cursor.execute(f"""DELETE FROM `{table}`""")
+        self.db_connector.commit()
+
+    def store(self) -> None:
+        plan = self.plan
+        self.clear()
+        generate_hallplan.put_attendance(self.db_connector, self.cursor, plan)
+
+
+def _schedule_reader(fmt: str) -> Callable[[Workload], Stage]:
+    def build(work: Workload) -> Stage:
+        slots = work.slots
+        sheet = synthetic.sheet(work.university.schedules, fmt, "schedules")
+
+        def run() -> pd.DataFrame:
+            sheet.seek(0)
+            refdata.stamp()
+            return generate_hallplan.process_schedule(work.cursor, sheet,
+                                                      slots)
+        return None, run
+    return build
+
+
+scenario("process_schedule")(_schedule_reader("csv"))
+scenario("process_schedule_xlsx")(_schedule_reader("xlsx"))
+scenario("process_schedule_parquet")(_schedule_reader("parquet"))
+
+
+@scenario("process_hall")
+def _process_hall(work: Workload) -> Stage:
+    sheet = synthetic.sheet(work.university.halls)
+
+    def run() -> pd.DataFrame:
+        sheet.seek(0)
+        refdata.stamp()
+        return generate_hallplan.process_hall(work.cursor, sheet,
+                                              synthetic.BUILDING_ID)
+    return None, run
+
+
+@scenario("allocate_seats")
+def _allocate_seats(work: Workload) -> Stage:
+    schedules, halls = work.schedules, work.halls
+    return None, lambda: generate_hallplan.allocate_seats(schedules, halls)
+
+
+@scenario("allocate_seats_packed")
+def _allocate_seats_packed(work: Workload) -> Stage:
+    schedules, halls = work.schedules, work.halls
+    return None, lambda: generate_hallplan.allocate_seats(
+        schedules, halls, strategy="packed"
+    )
+
+
+@scenario("summarize_hallplan")
+def _summarize_hallplan(work: Workload) -> Stage:
+    plan = work.plan
+    return None, lambda: generate_hallplan.summarize_hallplan(plan)
+
+
+@scenario("check_seating")
+def _check_seating(work: Workload) -> Stage:
+    plan = work.plan
+    return None, lambda: seating.check(plan)
+
+
+@scenario("repair_seating")
+def _repair_seating(work: Workload) -> Stage:
+    plan, halls = work.plan, work.halls
+    return None, lambda: seating.repair(plan, halls)
+
+
+@scenario("put_attendance")
+def _put_attendance(work: Workload) -> Stage:
+    plan = work.plan
+    return work.clear, lambda: generate_hallplan.put_attendance(
+        work.db_connector, work.cursor, plan
+    )
+
+
+@scenario("get_attendance_hall")
+def _get_attendance_hall(work: Workload) -> Stage:
+    work.store()
+    first = work.plan.iloc[0]
+    return None, lambda: fetch_data.get_attendance(
+        work.cursor, fmt="pandas", date=first["Date"].date(),
+        slot_no=int(first["SlotNo"]), class_id=int(first["ClassID"])
+    )
+
+
+@scenario("get_attendance_columnar")
+def _get_attendance_columnar(work: Workload) -> Stage:
+    work.store()
+    return None, lambda: fetch_data.get_attendance(work.cursor,
+                                                   fmt="columnar")
+
+
+@scenario("iter_attendance")
+def _iter_attendance(work: Workload) -> Stage:
+    work.store()
+    return None, lambda: sum(1 for _ in fetch_data.iter_attendance(
+        work.cursor
+    ))
+
+
+@scenario("update_presence")
+def _update_presence(work: Workload) -> Stage:
+    work.store()
+    first = work.plan.iloc[0]
+    hall = work.plan[(work.plan["Date"] == first["Date"])
+                     & (work.plan["SlotNo"] == first["SlotNo"])]
+    seats = {int(class_id): "".join("01"[i % 2] for i in range(int(seat)))
+             for class_id, seat in hall.groupby("ClassID")["Seat"].max()
+             .items()}
+    flipped = {class_id: bits.translate(str.maketrans("01", "10"))
+               for class_id, bits in seats.items()}
+    marks = cycle((seats, flipped))
+    return None, lambda: update_data.update_presence(
+        work.db_connector, work.cursor, date=first["Date"].date(),
+        slot_no=int(first["SlotNo"]), halls=next(marks)
+    )
+
+
+@scenario("replan_hallplan")
+def _replan_hallplan(work: Workload) -> Stage:
+    halls = work.halls
+    first = halls.iloc[0]
+    changed = halls.drop(index=halls.index[
+        (halls["Date"] == first["Date"])
+        & (halls["SlotNo"] == first["SlotNo"])
+        & (halls["RoomNo"] == first["RoomNo"])
+    ])
+    return work.store, lambda: generate_hallplan.replan_hallplan(
+        work.db_connector, work.cursor,
+        schedules=work.schedules, halls=changed
+    )
@@ -0,0 +1,182 @@
+# Copyright 2025 Harikrishna Srinivasan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from benchmarks import memdb
+from itertools import islice
+from string import ascii_uppercase
+from typing import Optional
+import datetime
+import io
+import numpy as np
+import pandas as pd
+
+"""
+Generates a synthetic university: campuses, programmes, sections and
+students, the exam halls of a building, and the slots, schedules and
+halls sheets of an exam season.
+"""
+
+DEGREES: tuple[tuple[str, int, tuple[Optional[str], ...]], ...] = (
+    ("B.Tech", 4, ("CSE", "ECE", "EEE", "MECH",
+                   "CIVIL", "IT", "CHEM", "BIOTECH")),
+    ("M.Tech", 2, ("CSE", "VLSI", "Structural", "Power")),
+    ("B.Sc", 3, ("Physics", "Chemistry", "Maths", "Biology")),
+    ("BCA", 3, (None,)),
+    ("B.Com", 3, (None,)),
+    ("MBA", 2, (None,))
+)
+
+SLOTS = (("09:00", "12:00"), ("13:30", "16:30"), ("17:00", "19:00"))
+
+PERIODS = (("08:45", "09:35"), ("09:35", "10:25"), ("10:40", "11:30"),
+           ("11:30", "12:20"), ("13:20", "14:10"), ("14:10", "15:00"),
+           ("15:15", "16:05"), ("16:05", "16:55"), ("17:00", "17:50"),
+           ("17:50", "18:40"), ("18:40", "19:30"))
+
+BUILDING_ID = 1
+
+
+class University:
+    r"""
+    The reference data and exam sheets of a synthetic university.
+
+    Parameters
+    ==========
+    - **students**: int
+      Students, split evenly over the programmes.
+
+    - **halls**: int
+      Exam halls, all in :data:`BUILDING_ID`.
+
+    - **groups**: int
+      (Date, SlotNo) groups of the exam season, :data:`SLOTS` a day.
+
+    - **campuses**: int
+      Campuses the programmes are spread over.
+
+    - **exams**: int
+      Exams written by every programme in the season.
+
+    - **section_size**, **capacity**: int
+      Students per section and seats per hall.
+
+    - **seed**: int
+      Seeds the exam timetable.
+    """
+    def __init__(self, *, students: int = 30000, halls: int = 250,
+                 groups: int = 60, campuses: int = 3, exams: int = 6,
+                 section_size: int = 60, capacity: int = 60,
+                 seed: int = 0) -> None:
+        rng = np.random.default_rng(seed)
+        programmes = [(degree, duration, stream, year)
+                      for degree, duration, streams in DEGREES
+                      for stream in streams
+                      for year in range(1, duration + 1)]
+        self.degrees = [{"name": degree, "duration": duration}
+                        for degree, duration, _ in DEGREES]
+        self.periods = [{"id": i, "start_time": start, "end_time": end}
+                        for i, (start, end) in enumerate(PERIODS, start=1)]
+        self.classes = [{"id": i, "building_id": BUILDING_ID,
+                         "room_no": 100 + i} for i in range(1, halls + 1)]
+
+        self.students: list[dict[str, object]] = []
+        size = -(-students // len(programmes))
+        section_id = 0
+        for programme_id, (degree, duration, stream, year) \
+                in enumerate(programmes, start=1):
+            campus_id = programme_id % campuses + 1
+            for roll_no in range(1, size + 1):
+                if len(self.students) == students:
+                    break
+                if roll_no % section_size == 1 or section_size == 1:
+                    section_id += 1
+                    section = ascii_uppercase[(roll_no - 1) // section_size
+                                              % len(ascii_uppercase)]
+                self.students.append({
+                    "student_id": len(self.students) + 1,
+                    "section_id": section_id,
+                    "degree": degree,
+                    "stream": stream,
+                    "year": year,
+                    "section": section,
+                    "campus_id": campus_id,
+                    "join_year": 2026 - year,
+                    "programme_id": programme_id,
+                    "roll_no": roll_no,
+                    "name": f"Student {len(self.students) + 1}"
+                })
+
+        days: list[datetime.date] = []
+        day = datetime.date(2026, 11, 2)
+        while len(days) * len(SLOTS) < groups:
+            if day.weekday() != 6:
+                days.append(day)
+            day += datetime.timedelta(days=1)
+        self.groups = list(islice(
+            ((day, slot_no) for day in days
+             for slot_no in range(1, len(SLOTS) + 1)), groups
+        ))
+
+        self.slots = pd.DataFrame(
+            [(no, *times) for no, times in enumerate(SLOTS, start=1)],
+            columns=["No", "StartTime", "EndTime"]
+        )
+        schedules = []
+        for programme_id, (degree, _, stream, year) \
+                in enumerate(programmes, start=1):
+            picks = rng.choice(len(self.groups), replace=False,
+                               size=min(exams, len(self.groups)))
+            for exam, pick in enumerate(sorted(picks), start=1):
+                day, slot_no = self.groups[pick]
+                schedules.append((year, degree, stream or "",
+                                  f"P{programme_id:03d}{year}{exam:02d}",
+                                  day, slot_no))
+        self.schedules = pd.DataFrame(schedules, columns=[
+            "Year", "Degree", "Stream", "CourseCode", "Date", "SlotNo"
+        ])
+        self.schedules["Date"] = pd.to_datetime(self.schedules["Date"])
+        self.halls = pd.DataFrame(
+            [(cls["room_no"], capacity, day, slot_no)
+             for day, slot_no in self.groups for cls in self.classes],
+            columns=["RoomNo", "Capacity", "Date", "SlotNo"]
+        )
+        self.halls["Date"] = pd.to_datetime(self.halls["Date"])
+
+    def load(self, connection: memdb.Connection) -> None:
+        """
+        Loads the reference tables into ``connection``.
+        """
+        connection.load("degrees", self.degrees)
+        connection.load("periods", self.periods)
+        connection.load("classes", self.classes)
+        connection.load("section_student_details", self.students)
+
+
+def sheet(frame: pd.DataFrame, fmt: str = "csv",
+          sheet_name: str = "Sheet1") -> io.BytesIO:
+    """
+    Writes ``frame`` as an uploaded sheet: a CSV file with dates as
+    dd/mm/yyyy, or an Excel workbook (``"xlsx"``) or Parquet file
+    keeping the dates as dates.
+    """
+    buffer = io.BytesIO()
+    if fmt == "xlsx":
+        frame.to_excel(buffer, sheet_name=sheet_name, index=False)
+    elif fmt == "parquet":
+        frame.to_parquet(buffer, index=False)
+    else:
+        frame.to_csv(buffer, index=False, date_format="%d/%m/%Y")
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,168 @@
+# Copyright 2025 Harikrishna Srinivasan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from Timetable.typehints import Connection, Optional
+from collections.abc import Callable
+from functools import partial
+from typing import Any
+import pymysql
+import threading
+import time
+
+"""
+Pools database connections, so that concurrent requests
+do not queue up on the single connection made at login.
+"""
+
+
+class ConnectionPool:
+    r"""
+    A bounded pool of connections opened by ``connect``.
+
+    Parameters
+    ==========
+    - **connect**: Callable[[], Connection]
+      Opens a new connection when the pool is below ``size``.
+
+    - **size**: int
+      The maximum number of connections open at once.
+
+    - **timeout**: float
+      Seconds to wait for a free connection before ``TimeoutError``.
+
+    - **ping_interval**: float
+      Connections idle for longer than this are pinged before reuse.
+    """
+    def __init__(self, connect: Callable[[], Connection], *,
+                 size: int = 8, timeout: float = 30.0,
+                 ping_interval: float = 30.0) -> None:
+        self._connect = connect
+        self._size = size
+        self._timeout = timeout
+        self._ping_interval = ping_interval
+        self._idle: list[tuple[Connection, float]] = []
+        self._open = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.acquired = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+
+    def acquire(self) -> Connection:
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed!")
+                if self._idle or self._open < self._size:
+                    break
+                remaining = self._timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    raise TimeoutError("No database connection available!")
+                self._cond.wait(remaining)
+
+            waited = time.monotonic() - start
+            self.acquired += 1
+            self.wait_time += waited
+            self.max_wait = max(self.max_wait, waited)
+            if self._idle:
+                connector, last_used = self._idle.pop()
+            else:
+                connector, last_used = None, 0.0
+                self._open += 1
+
+        try:
+            if connector is None:
+                connector = self._connect()
+            elif time.monotonic() - last_used > self._ping_interval:
+                connector.ping(reconnect=True)
+        except pymysql.err.Error:
+            self._discard(connector)
+            raise
+        return connector
+
+    def release(self, connector: Connection) -> None:
+        try:
+            connector.rollback()
+        except pymysql.err.Error:
+            self._discard(connector)
+            return
+
+        with self._cond:
+            if self._closed:
+                self._open -= 1
+                connector.close()
+            else:
+                self._idle.append((connector, time.monotonic()))
+            self._cond.notify()
+
+    def _discard(self, connector: Optional[Connection]) -> None:
+        if connector is not None:
+            try:
+                connector.close()
+            except pymysql.err.Error:
+                pass
+
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            for connector, _ in self._idle:
+                self._open -= 1
+                connector.close()
+            self._idle.clear()
+            self._cond.notify_all()
+
+    def stats(self) -> dict[str, float | int]:
+        with self._cond:
+            return {
+                "size": self._size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "acquired": self.acquired,
+                "wait_time": self.wait_time,
+                "max_wait": self.max_wait
+            }
+
+
+def login_settings(db_connector: Connection) -> dict[str, Any]:
+    """
+    Returns the ``pymysql.connect`` arguments naming the server, account,
+    database and character set that ``db_connector`` was opened with.
+
+    Other connect settings (``local_infile``, SSL, timeouts) are not read
+    back from the connection; pass them to :func:`connect_with` instead.
+    """
+    return {
+        "host": db_connector.host,
+        "port": db_connector.port,
+        "unix_socket": db_connector.unix_socket,
+        "user": db_connector.user,
+        "password": db_connector.password,
+        "database": db_connector.db,
+        "charset": db_connector.charset,
+        "autocommit": db_connector.autocommit_mode
+    }
+
+
+def connect_with(**settings: Any) -> Callable[[], Connection]:
+    """
+    Returns a function opening a fresh connection with
+    ``pymysql.connect(**settings)``.
+    """
+    return partial(pymysql.connect, **settings)
@@ -0,0 +1,110 @@
+# Copyright 2025 Harikrishna Srinivasan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from Timetable.typehints import Connection, Cursor, Optional
+from collections.abc import Iterable
+from itertools import chain
+import datetime
+import hallplan_cache
+
+"""
+Keeps the `exam_roster` table, i.e. the `attendance` table joined with
+the students' sections, register numbers and rooms, in step with it.
+
+The roster of a (date, slot_no) is rebuilt, and the plan version
+stamped, in the same transaction as every write of its plan; presence
+is written to both tables by `update_data`. A plan stored before the roster existed is backfilled
+when its database is first used.
+"""
+
+_COLUMNS = """(`date`, `slot_no`, `class_id`, `seat`, `student_id`,
+           `room_no`, `course_code`, `section_id`, `degree`, `stream`,
+           `year`, `section`, `reg_no`, `name`, `is_present`)"""
+
+_SELECT = """SELECT `att`.`date`, `att`.`slot_no`, `att`.`class_id`,
+          `att`.`seat`, `att`.`student_id`, `classes`.`room_no`,
+          `att`.`course_code`, `SSD`.`section_id`, `SSD`.`degree`,
+          `SSD`.`stream`, `SSD`.`year`, `SSD`.`section`,
+          CONCAT(
+              `campus_id`,
+              LPAD(MOD((`join_year` + `duration`),
+                   100), 2, '0'),
+              LPAD(`programme_id`, 3, '0'),
+              LPAD(`roll_no`, 3, '0')
+          ),
+          `SSD`.`name`, `att`.`is_present`
+          FROM `attendance` `att`
+          JOIN `classes`
+          ON `att`.`class_id`=`classes`.`id`
+          JOIN `section_student_details` `SSD`
+          ON `att`.`student_id`=`SSD`.`student_id`
+          JOIN `degrees`
+          ON `degrees`.`name`=`SSD`.`degree`"""
+
+
+def rebuild(cursor: Cursor, /,
+            groups: Optional[Iterable[tuple[datetime.date, int]]] = None
+            ) -> int:
+    """
+    Rebuilds the roster of the given (date, slot_no) groups from
+    `attendance` within the caller's transaction, or the whole roster
+    if ``groups`` is ``None``, and stamps the plan version.
+    Returns the number of rows written.
+    """
+    if groups is None:
+        delete, where, params = "", "", []
+    else:
+        groups = tuple(dict.fromkeys(groups))
+        if not groups:
+            return 0
+
+        predicate = " OR ".join(["(`date`=%s AND `slot_no`=%s)"]
+                                * len(groups))
+        params = list(chain.from_iterable(groups))
+        delete = f" WHERE {predicate}"
+        where = " WHERE " + " OR ".join(
+            ["(`att`.`date`=%s AND `att`.`slot_no`=%s)"] * len(groups)
+        )
+
+    hallplan_cache.stamp(cursor)
+    cursor.execute("""DELETE FROM `exam_roster`""" + delete, params)
+    return cursor.execute(f"""INSERT INTO `exam_roster` {_COLUMNS}
+                          {_SELECT}{where}""", params)
+
+
+def refresh(db_connector: Connection, cursor: Cursor, /,
+            groups: Optional[Iterable[tuple[datetime.date, int]]] = None
+            ) -> int:
+    """
+    Like :func:`rebuild`, in a transaction of its own.
+    """
+    try:
+        written = rebuild(cursor, groups)
+    except Exception:
+        db_connector.rollback()
+        raise
+
+    db_connector.commit()
+    return written
+
+
+def backfill(db_connector: Connection, cursor: Cursor) -> None:
+    """
+    Builds the roster of a plan stored before the roster existed.
+    """
+    cursor.execute("""SELECT EXISTS(SELECT 1 FROM `attendance`)
+                   AND NOT EXISTS(SELECT 1 FROM `exam_roster`) AS `stale`""")
+    if cursor.fetchone()["stale"]:
+        refresh(db_connector, cursor)
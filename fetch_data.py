@@ -14,8 +14,14 @@
 
 
 from Timetable.typehints import Cursor, Literal, Optional
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import chain
+from pandas.api.types import union_categoricals
 import datetime
+import metrics
+import numpy as np
 import pandas as pd
+import pymysql.cursors
 
 """
 Shows the data for tables,
@@ -28,9 +34,148 @@ def get_slots(cursor: Cursor) -> tuple[dict[str, datetime.datetime | int]]:
     return tuple(cursor.fetchall())
 
 
+def _where(predicates: dict[str, object],
+           *conditions: tuple[str, Sequence[object]]
+           ) -> tuple[str, list[object]]:
+    """
+    Builds a ``WHERE`` clause matching every column whose value is given,
+    and every further ``(condition, params)`` pair.
+    """
+    given = {column: value for column, value in predicates.items()
+             if value is not None}
+    clauses = [f"{column}=%s" for column in given]
+    params = list(given.values())
+    for condition, args in conditions:
+        clauses.append(condition)
+        params.extend(args)
+    if not clauses:
+        return "", []
+    return " WHERE " + " AND ".join(clauses), params
+
+
+def _null_streams(streams: pd.Series) -> pd.Series:
+    return streams.where(streams.astype(bool), "NULL")
+
+
+@metrics.stage("stream_attendance")
+def _stream_attendance(cursor: Cursor, query: str, params: list[object], *,
+                       batch_size: int) -> pd.DataFrame:
+    """
+    Streams the attendance roster through an unbuffered server-side cursor,
+    typing every batch of ``batch_size`` rows as it arrives.
+    """
+    dtypes = {
+        "Date": "datetime64[s]",
+        "SlotNo": "uint8",
+        "Degree": "category",
+        "Stream": "category",
+        "Year": "uint8",
+        "Section": "category",
+        "ClassID": "uint32",
+        "RoomNo": "uint16",
+        "Seat": "uint8",
+        "CourseCode": "category",
+        "ID": "uint32",
+        "Present": "bool"
+    }
+    chunks: list[pd.DataFrame] = []
+    with metrics.TimedCursor(
+            cursor.connection.cursor(pymysql.cursors.SSCursor)) as stream:
+        stream.execute(query, params)
+        columns = [column[0] for column in stream.description]
+        while rows := stream.fetchmany(batch_size):
+            chunk = pd.DataFrame.from_records(rows, columns=columns)
+            chunk["Stream"] = _null_streams(chunk["Stream"])
+            chunks.append(chunk.astype(dtypes, copy=False))
+
+    if not chunks:
+        return pd.DataFrame(columns=columns).astype(dtypes, copy=False)
+    attendance = {
+        column: union_categoricals([chunk[column] for chunk in chunks])
+        if dtypes.get(column) == "category"
+        else np.concatenate([chunk[column].to_numpy() for chunk in chunks])
+        for column in columns
+    }
+    return pd.DataFrame(attendance, copy=False)
+
+
+def get_section_students(
+    cursor: Cursor, /, *,
+    programmes: Iterable[tuple[str, Optional[str], int]],
+    campus_id: Optional[int] = None
+) -> tuple[dict[str, int | str], ...]:
+    """
+    Fetches the students of every section of the given
+    (degree, stream, year) programmes in a single query.
+    """
+    programmes = tuple(programmes)
+    if not programmes:
+        return ()
+
+    predicate = " OR ".join(["""(`SSD`.`degree`=%s
+                             AND `SSD`.`stream`<=>%s
+                             AND `SSD`.`year`=%s)"""] * len(programmes))
+    params: list[int | str | None] = list(chain.from_iterable(programmes))
+    query = f"""SELECT `SSD`.`degree` AS `Degree`,
+            `SSD`.`stream` AS `Stream`,
+            `SSD`.`year` AS `Year`,
+            `SSD`.`section_id` AS `SectionID`,
+            `SSD`.`section` AS `Section`,
+            CONCAT(
+                `campus_id`,
+                LPAD(MOD((`join_year` + `duration`),
+                     100), 2, '0'),
+                LPAD(`programme_id`, 3, '0'),
+                LPAD(`roll_no`, 3, '0')
+            ) AS `RegNo`,
+            `SSD`.`student_id` AS `ID`
+            FROM `section_student_details` `SSD`
+            JOIN `degrees`
+            ON `degrees`.`name`=`SSD`.`degree`
+            WHERE ({predicate})"""
+    if campus_id:
+        query += """ AND `SSD`.`campus_id`=%s"""
+        params.append(campus_id)
+
+    cursor.execute(query + """ ORDER BY `SectionID`, `RegNo`""", params)
+    return tuple(cursor.fetchall())
+
+
+_ATTENDANCE = ("date", "slot_no", "course_code", "class_id",
+               "student_id", "seat", "is_present")
+
+_KEY = ("date", "slot_no", "student_id")
+
+
+def _predicates(**columns: object) -> dict[str, object]:
+    """
+    Maps each column, quoted for :func:`_where`, to its value.
+    """
+    return {f"`{column}`": value for column, value in columns.items()}
+
+
+def _attendance_query(predicates: dict[str, object],
+                      *conditions: tuple[str, Sequence[object]]
+                      ) -> tuple[str, list[object], list[str]]:
+    """
+    Selects the ``attendance`` columns not pinned by ``predicates``,
+    from ``exam_roster`` when a section is asked for, since it carries
+    the students' sections. Returns the query, its parameters and the
+    columns selected; with every column pinned, it selects ``1`` per
+    matching row.
+    """
+    columns = [f"`{column}`" for column in _ATTENDANCE
+               if predicates.get(f"`{column}`") is None]
+    table = "exam_roster" if predicates.get("`section_id`") is not None \
+        else "attendance"
+    where, params = _where(predicates, *conditions)
+    return (f"""SELECT {", ".join(columns) or "1"}
+            FROM `{table}`{where}""", params, columns)
+
+
 def get_attendance(
     cursor: Cursor, /, *,
-    fmt: Literal["sql", "pandas"] = "sql",
+    fmt: Literal["sql", "pandas", "columnar"] = "sql",
     date: Optional[datetime.date] = None,
     slot_no: Optional[int] = None,
     section_id: Optional[int] = None,
@@ -38,10 +183,16 @@ def get_attendance(
     course_code: Optional[str] = None,
     student_id: Optional[int] = None,
     seat: Optional[int] = None,
-    is_present: Optional[bool] = None
+    is_present: Optional[bool] = None,
+    batch_size: int = 10000
 ) -> pd.DataFrame | tuple[dict[str, int | str | bool], ...]:
-    if fmt == "pandas":
-        cursor.execute("""SELECT `date` AS `Date`,
+    predicates = _predicates(date=date, slot_no=slot_no, class_id=class_id,
+                             section_id=section_id, course_code=course_code,
+                             student_id=student_id, seat=seat,
+                             is_present=is_present)
+    if fmt in ("pandas", "columnar"):
+        where, params = _where(predicates)
+        query = """SELECT `date` AS `Date`,
                        `slot_no` AS `SlotNo`,
                        `degree` AS `Degree`,
                        `stream` AS `Stream`,
@@ -51,95 +202,75 @@ def get_attendance(
                        `room_no` AS `RoomNo`,
                        `seat` AS `Seat`,
                        `course_code` AS `CourseCode`,
-                       CONCAT(
-                            `campus_id`,
-                            LPAD(MOD((`join_year` + `duration`),
-                                 100), 2, '0'),
-                            LPAD(`programme_id`, 3, '0'),
-                            LPAD(`roll_no`, 3, '0')
-                       ) AS `RegNo`,
-                       `SSD`.`student_id` AS `ID`,
-                       `SSD`.`name` AS `Name`,
+                       `reg_no` AS `RegNo`,
+                       `student_id` AS `ID`,
+                       `name` AS `Name`,
                        `is_present` AS `Present`
-                       FROM `attendance` `att`
-                       JOIN `classes`
-                       ON `class_id`=`classes`.`id`
-                       JOIN `section_student_details` `SSD`
-                       ON `att`.`student_id`=`SSD`.`student_id`
-                       JOIN `degrees`
-                       ON `degrees`.`name`=`degree`""")
-        attendance = pd.DataFrame(cursor.fetchall(), copy=False) \
-            .astype({"Date": "datetime64[s]"}, copy=False)
-        attendance["Stream"] = attendance.apply(
-            lambda r: r.Stream if r.Stream else "NULL", axis=1
-        )
+                       FROM `exam_roster`""" + where
+        if fmt == "columnar":
+            return _stream_attendance(cursor, query, params,
+                                      batch_size=batch_size)
+
+        cursor.execute(query, params)
+        with metrics.stage("attendance_frame"):
+            attendance = pd.DataFrame(
+                cursor.fetchall(),
+                columns=[column[0] for column in cursor.description]
+            ).astype({"Date": "datetime64[s]"}, copy=False)
+            attendance["Stream"] = _null_streams(attendance["Stream"])
         return attendance
 
-    if date:
-        if slot_no:
-            if section_id:
-                cursor.execute("""SELECT `course_code`, `class_id`,
-                               `student_id`, `seat`, `is_present`
-                               FROM `attendance` `att`
-                               JOIN `section_students` `SS`
-                               ON `att`.`student_id`=`SS`.`student_id`
-                               AND `date`=%s
-                               AND `slot_no`=%s
-                               AND `SS`.`section_id`=%s""",
-                               (date, slot_no, section_id))
-            else:
-                cursor.execute("""SELECT `course_code`, `class_id`,
-                               `student_id`, `seat`, `is_present`
-                               FROM `attendance`
-                               WHERE `date`=%s
-                               AND `slot_no`=%s""", (date, slot_no))
-        elif section_id:
-            cursor.execute("""SELECT `course_code`, `slot_no`,
-                           `class_id`, `student_id`, `seat`, `is_present`
-                           FROM `attendance` `att`
-                           JOIN `section_students` `SS`
-                           ON `att`.`student_id`=`SS`.`student_id`
-                           AND `date`=%s
-                           AND `SS`.`section_id`=%s""",
-                           (date, section_id))
-    elif slot_no:
-        if section_id:
-            cursor.execute("""SELECT `date`, `course_code`, `class_id`,
-                           `student_id`, `seat`, `is_present`
-                           FROM `attendance` `att`
-                           JOIN `section_students` `SS`
-                           ON `att`.`student_id`=`SS`.`student_id`
-                           AND `slot_no`=%s
-                           AND `SS`.`section_id`=%s""",
-                           (slot_no, section_id))
-        else:
-            cursor.execute("""SELECT `date`, `course_code`,
-                           `class_id`, `student_id`, `seat`, `is_present`
-                           FROM `attendance`
-                           WHERE `slot_no`=%s""", (slot_no,))
-    elif section_id:
-        cursor.execute("""SELECT `date`, `slot_no`, `course_code`,
-                       `class_id`, `course_code`,
-                       `student_id`, `seat`, `is_present`
-                       FROM `attendance` `att`
-                       JOIN `section_students` `SS`
-                       ON `att`.`student_id`=`SS`.`student_id`
-                       AND `SS`.`section_id`=%s""", (section_id,))
-    else:
-        cursor.execute("""SELECT * FROM `attendance`""")
-
-    res = cursor.fetchall()
-    if course_code:
-        res = tuple(d for d in res if d.pop("course_code") == course_code)
-    if class_id:
-        res = tuple(d for d in res if d.pop("class_id") == class_id)
-    if student_id:
-        res = tuple(d for d in res if d.pop("student_id") == student_id)
-    if seat:
-        res = tuple(d for d in res if d.pop("seat") == seat)
-    if is_present is not None:
-        res = tuple(d for d in res if d.pop("is_present") == is_present)
-    return res
+    query, params, columns = _attendance_query(predicates)
+    cursor.execute(query, params)
+    if not columns:
+        return tuple({} for _ in cursor.fetchall())
+    return tuple(cursor.fetchall())
+
+
+def iter_attendance(
+    cursor: Cursor, /, *,
+    date: Optional[datetime.date] = None,
+    slot_no: Optional[int] = None,
+    section_id: Optional[int] = None,
+    class_id: Optional[int] = None,
+    course_code: Optional[str] = None,
+    student_id: Optional[int] = None,
+    seat: Optional[int] = None,
+    is_present: Optional[bool] = None,
+    batch_size: int = 10000
+) -> Iterator[dict[str, int | str | bool]]:
+    """
+    Yields the rows of ``get_attendance(fmt="sql")`` in (date, slot_no,
+    student_id) order, a page of ``batch_size`` rows at a time. Every
+    page seeks past the last key of the one before on the primary key,
+    so no page costs more than the first and memory stays constant.
+    """
+    predicates = _predicates(date=date, slot_no=slot_no, class_id=class_id,
+                             section_id=section_id, course_code=course_code,
+                             student_id=student_id, seat=seat,
+                             is_present=is_present)
+    unpinned = [f"`{column}`" for column in _KEY
+                if predicates[f"`{column}`"] is None]
+    order = f""" ORDER BY {", ".join(unpinned)} LIMIT %s""" \
+        if unpinned else ""
+    after: list[tuple[str, list[object]]] = []
+    while True:
+        query, params, columns = _attendance_query(predicates, *after)
+        if not unpinned:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            yield from rows if columns else ({} for _ in rows)
+            return
+
+        cursor.execute(query + order, [*params, batch_size])
+        rows = cursor.fetchall()
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        last = rows[-1]
+        after = [(f"""({", ".join(unpinned)}) > ({", ".join(
+            ["%s"] * len(unpinned))})""",
+                  [last[column.strip("`")] for column in unpinned])]
 
 
 def get_invigilator(
@@ -149,82 +280,30 @@ def get_invigilator(
     section_id: Optional[int] = None,
     faculty_id: Optional[int] = None
 ) -> tuple[dict[str, int | str], ...]:
-    if date:
-        if slot_no:
-            if section_id:
-                cursor.execute("""SELECT `faculty_id`, `class_id`
-                               FROM `invigilators` `inv`
-                               JOIN `attendance` `att`
-                               ON `att`.`date`=`inv`.`date`
-                               AND `att`.`slot_no`=`inv`.`slot_no`
-                               AND `att`.`date`=%s
-                               AND `att`.`slot_no`=%s
-                               JOIN `section_students` `SS`
-                               ON `SS`.`student_id`=`att`.`student_id`
-                               AND `att`.`section_id`=%s""",
-                               (date, slot_no, section_id))
-            else:
-                cursor.execute("""SELECT `faculty_id`, `class_id`
-                               FROM `invigilators` `inv`
-                               JOIN `attendance` `att`
-                               ON `att`.`date`=`inv`.`date`
-                               AND `att`.`slot_no`=`inv`.`slot_no`
-                               AND `att`.`date`=%s
-                               AND `att`.`slot_no`=%s""",
-                               (date, slot_no))
-        elif section_id:
-            cursor.execute("""SELECT `faculty_id`, `slot_no`, `class_id`
-                           FROM `invigilators` `inv`
-                           JOIN `attendance` `att`
-                           ON `att`.`date`=`inv`.`date`
-                           AND `att`.`slot_no`=`inv`.`slot_no`
-                           AND `att`.`date`=%s
-                           JOIN `section_students` `SS`
-                           ON `SS`.`student_id`=`att`.`student_id`
-                           AND `att`.`section_id`=%s""",
-                           (slot_no, section_id))
-        else:
-            cursor.execute("""SELECT `faculty_id`, `slot_no`, `class_id`
-                           FROM `invigilators` `inv`
-                           JOIN `attendance` `att`
-                           ON `att`.`date`=`inv`.`date`
-                           AND `att`.`date`=%s
-                           AND `att`.`slot_no`=`inv`.`slot_no`""",
-                           (date,))
-    elif slot_no:
-        if section_id:
-            cursor.execute("""SELECT `faculty_id`, `date`, `class_id`
-                           FROM `invigilators` `inv`
-                           JOIN `attendance` `att`
-                           ON `att`.`date`=`inv`.`date`
-                           AND `att`.`slot_no`=`inv`.`slot_no`
-                           AND `att`.`date`=%s
-                           JOIN `section_students` `SS`
-                           ON `SS`.`student_id`=`att`.`student_id`
-                           AND `att`.`section_id`=%s""",
-                           (slot_no, section_id))
-        else:
-            cursor.execute("""SELECT `faculty_id`, `date`, `class_id`
-                           FROM `invigilator` `inv`
-                           JOIN `attendance` `att`
-                           ON `att`.`date`=`inv`.`date`
-                           AND `att`.`slot_no`=`inv`.`slot_no`
-                           AND `att`.`slot_no`=%s""", (slot_no,))
-    elif section_id:
-        cursor.execute("""SELECT `faculty_id`, `date`,
-                       `slot_no`, `class_id`
-                       FROM `invigilators` `inv`
-                       JOIN `attendance` `att`
-                       ON `att`.`date`=`inv`.`date`
-                       AND `att`.`slot_no`=`inv`.`slot_no`
-                       JOIN `section_students` `SS`
-                       ON `SS`.`student_id`=`att`.`student_id`
-                       AND `att`.`section_id`=%s""", (section_id,))
-    else:
-        cursor.execute("""SELECT * FROM `invigilators`""")
-
-    res = cursor.fetchall()
-    if faculty_id:
-        res = tuple(d for d in res if d.pop("faculty_id") == faculty_id)
-
-    return res
+    """
+    Returns one row per invigilator duty matching every given argument,
+    with the ``faculty_id``, ``date`` and ``slot_no`` not given and the
+    ``class_id``. With ``section_id``, only the halls the section's
+    students sit in, matched on (date, slot_no, class_id) against the
+    distinct halls of the section's roster rows.
+    """
+    columns = [f"`inv`.`{column}`"
+               for column, value in (("faculty_id", faculty_id),
+                                     ("date", date), ("slot_no", slot_no))
+               if value is None]
+    query = f"""SELECT {", ".join([*columns, "`inv`.`class_id`"])}
+            FROM `invigilators` `inv`"""
+    params: list[object] = []
+    if section_id is not None:
+        where, params = _where({"`section_id`": section_id,
+                                "`date`": date, "`slot_no`": slot_no})
+        query += f"""
+            JOIN (SELECT DISTINCT `date`, `slot_no`, `class_id`
+                  FROM `exam_roster`{where}) `ER`
+            ON `ER`.`date`=`inv`.`date`
+            AND `ER`.`slot_no`=`inv`.`slot_no`
+            AND `ER`.`class_id`=`inv`.`class_id`"""
+    where, args = _where({"`inv`.`date`": date, "`inv`.`slot_no`": slot_no,
+                          "`inv`.`faculty_id`": faculty_id})
+    cursor.execute(query + where, params + args)
+    return tuple(cursor.fetchall())
@@ -14,27 +14,87 @@
 
 
 from Timetable.typehints import Connection, Cursor, FileStorage, Optional
-from Timetable import fetch_data, show_data
-from datetime import datetime
-from random import randint
+from Timetable import fetch_data
+from collections.abc import Callable
+from datetime import datetime, time, timedelta
+from itertools import chain
 import add_attendance as add_att
 import attendance
+import bisect
+import exam_roster
+import heapq
+import fetch_data as fetch_att
+import ingest
+import metrics
+import numpy as np
 import pandas as pd
 import pymysql
+import random
+import refdata
+import seating
+import update_data as update_att
 
 
 def fmt(t: str) -> datetime:
     return datetime.strptime(t, "%H:%M")
 
 
+def minutes(t: object) -> int:
+    """
+    Converts a time of day, as text, ``time`` or MySQL ``TIME``
+    (a ``timedelta``), to minutes since midnight.
+    """
+    if isinstance(t, timedelta):
+        return int(t.total_seconds()) // 60
+    if isinstance(t, str):
+        t = fmt(t[:5])
+    if not isinstance(t, (time, datetime)):
+        raise TypeError(f"Not a time of day: {t!r}")
+    return t.hour * 60 + t.minute
+
+
+def map_periods(starts: pd.Series, ends: pd.Series,
+                periods: tuple[dict[str, bool | int | str], ...]) -> list[set]:
+    """
+    Maps each (start, end) slot to the ids of the periods it spans,
+    from the last period starting by the slot's start to the first
+    later period ending at or after the slot's end.
+
+    The rule is the one of the row-wise mapping this replaces: a slot
+    within a single period spans the next period too, and a slot with
+    no later period ending after it spans none. Periods are parsed once
+    into sorted start and end arrays, and all slots are located in them
+    with ``searchsorted``.
+    """
+    ordered = sorted(periods, key=lambda period: minutes(period["start_time"]))
+    ids = [0, *(period["id"] for period in ordered), 0]
+    pstarts = np.array([minutes(period["start_time"]) for period in ordered])
+    pends = np.maximum.accumulate(
+        [minutes(period["end_time"]) for period in ordered] or [0]
+    )[:len(ordered)]
+
+    _starts = starts.map({t: minutes(t) for t in starts.unique()})
+    _ends = ends.map({t: minutes(t) for t in ends.unique()})
+    first = np.searchsorted(pstarts, _starts.to_numpy(), side="right")
+    last = np.maximum(first,
+                      np.searchsorted(pends, _ends.to_numpy(), side="left"))
+    last = np.minimum(last + 1, len(ordered) + 1)
+
+    n = len(ids)
+    spans, codes = np.unique(first * n + last, return_inverse=True)
+    spanned = [set(range(ids[span // n], ids[span % n] + 1))
+               for span in spans]
+    return [spanned[code] for code in codes]
+
+
 def process_slot(db_connector: Connection, cursor: Cursor, /,
                  slot_sheet: FileStorage) -> pd.DataFrame:
     attendance.create_hallplan(db_connector, cursor)
+    exam_roster.backfill(db_connector, cursor)
+    refdata.stamp()
     headers = ["No", "StartTime", "EndTime"]
-    slots = pd.read_excel(slot_sheet, sheet_name="slots",
-                          names=headers,
-                          engine="openpyxl").astype({"No": "uint8"},
-                                                    copy=False)
+    slots = ingest.read_sheet(slot_sheet, "slots", headers,
+                              dtypes={"No": "uint8"})
     try:
         for _, slot in slots.iterrows():
             add_att.add_slot(db_connector, cursor,
@@ -47,135 +107,292 @@ def process_slot(db_connector: Connection, cursor: Cursor, /,
     return slots
 
 
+def get_rosters(cursor: Cursor, /,
+                schedules: pd.DataFrame, *,
+                campus_id: Optional[int] = None) -> pd.DataFrame:
+    """
+    Resolves the sections and students of every (Degree, Stream, Year)
+    in ``schedules`` with one query, one row per section.
+    """
+    keys = ["Degree", "Stream", "Year"]
+    programmes = schedules[keys].drop_duplicates()
+    roster = pd.DataFrame(refdata.section_students(
+        cursor, campus_id=campus_id,
+        programmes=[(degree, stream or None, int(year))
+                    for degree, stream, year
+                    in programmes.itertuples(index=False)]
+    ), columns=[*keys, "SectionID", "Section", "RegNo", "ID"])
+    roster["Stream"] = roster["Stream"].fillna("")
+    roster["Year"] = roster["Year"].astype(schedules["Year"].dtype)
+    roster["Students"] = list(zip(roster["RegNo"], roster["ID"]))
+    return roster.groupby([*keys, "SectionID", "Section"], sort=False)[
+        "Students"].agg(list).reset_index()
+
+
+@metrics.stage("schedules")
 def process_schedule(cursor: Cursor, /,
                      schedule_sheet: FileStorage,
                      slots: pd.DataFrame, *,
                      campus_id: Optional[int] = None) -> pd.DataFrame:
-    deg_stream: dict[tuple[str, str], int] = {}
-
-    def get_sections(row: pd.Series) -> list[dict[str, int | str]]:
-        year, degree, stream = row[["Year", "Degree", "Stream"]]
-        return [sections
-                for sections in fetch_data.get_sections(
-                    cursor,
-                    campus_id=campus_id,
-                    degree=degree,
-                    stream=stream,
-                    year=year)]
-
-    def intersect(schedules: pd.DataFrame,
-                  periods: tuple[dict[str, bool | int | str]]) -> None:
-        start_end: dict[tuple[datetime, datetime], int] = {}
-
-        def periods_intersect(start: str, end: str) -> list[int]:
-            _start = fmt(start)
-            _end = fmt(end)
-            if period_ids := start_end.get((_start, _end)):
-                return [period_ids]
-
-            _pstart = _pend = 0
-            for period in periods:
-                pstart = fmt(period["start_time"])
-                pend = fmt(period["end_time"])
-                if pstart <= _start:
-                    _pstart = period["id"]
-                elif _end <= pend:
-                    _pend = period["id"]
-                    break
-
-            start_end[(start, end)] = set(range(_pstart, _pend + 1))
-            return start_end[(start, end)]
-
-        schedules["Periods"] = schedules.apply(
-            lambda row: periods_intersect(row.StartTime, row.EndTime),
-            axis=1
-        )
-
-    def get_students(section):
-        degree, stream = section.Degree, section.Stream
-        stream = stream if stream else "NULL"
-        if not deg_stream.get((degree, stream)):
-            programme_id = show_data.get_programme_id(cursor, degree=degree,
-                                                      stream=stream)
-            deg_stream[(degree, stream)] = programme_id
-
-        return [(std["reg_no"], std["id"]) for std in fetch_data.get_students(
-            cursor, campus_id=campus_id,
-            programme_id=deg_stream[(degree, stream)],
-            section_id=section.SectionID)]
-
     headers = ["Year", "Degree", "Stream", "CourseCode", "Date", "SlotNo"]
-    schedules = pd.read_excel(
-        schedule_sheet, sheet_name="schedules",
-        keep_default_na=False, parse_dates=["Date"],
-        date_format="%d/%m/%Y",
-        names=headers
-    ).astype({"Year": "uint8", "SlotNo": "category"}, copy=False)
+    schedules = ingest.read_sheet(
+        schedule_sheet, "schedules", headers,
+        dtypes={"Year": "uint8", "SlotNo": "uint8"},
+        dates=["Date"], keep_default_na=False
+    ).astype({"SlotNo": "category"}, copy=False)
     schedules = schedules.merge(slots, how="inner",
                                 left_on="SlotNo", right_on="No")
-    schedules["Sections"] = schedules.apply(get_sections, axis=1)
-    schedules = schedules.explode("Sections")
-    schedules = pd.concat([schedules.drop("Sections", axis=1)
-                           .reset_index(drop=True),
-                          pd.json_normalize(schedules["Sections"])],
-                          axis=1)
-    intersect(schedules, fetch_data.get_periods(cursor))
-    schedules.rename(columns={"id": "SectionID", "section": "Section"},
-                     inplace=True)
-    schedules["Students"] = schedules.apply(get_students, axis=1)
+    schedules = schedules.merge(get_rosters(cursor, schedules,
+                                            campus_id=campus_id),
+                                how="inner", on=["Degree", "Stream", "Year"])
+    schedules["Periods"] = map_periods(schedules["StartTime"],
+                                       schedules["EndTime"],
+                                       fetch_data.get_periods(cursor))
     return schedules
 
 
+@metrics.stage("halls")
 def process_hall(cursor: Cursor, /,
                  hall_sheet: FileStorage,
                  building_id: Optional[int] = None) -> pd.DataFrame:
-    def get_class(room_no):
-        cls = fetch_data.get_class(cursor, building_id=building_id,
-                                   room_no=room_no)
-        return cls["id"] if cls else None
-
     headers = ["RoomNo", "Capacity", "Date", "SlotNo"]
     to_types = {"ID": "uint16", "RoomNo": "uint16",
                 "Capacity": "uint8", "Seat": "uint8"}
-    halls = pd.read_excel(hall_sheet, sheet_name="halls",
-                          parse_dates=["Date"],
-                          date_format="%d/%m/%Y",
-                          names=headers,
-                          engine="openpyxl")
-    halls["ID"] = halls.apply(
-        lambda hall: get_class(hall.RoomNo),
-        axis=1
-    )
+    halls = ingest.read_sheet(hall_sheet, "halls", headers,
+                              dtypes={"RoomNo": "uint16",
+                                      "Capacity": "uint8",
+                                      "SlotNo": "uint8"},
+                              dates=["Date"])
+    halls["ID"] = refdata.class_ids(cursor, building_id, halls["RoomNo"])
     halls["Seat"] = 0
     halls = halls.astype(to_types, copy=False)
     return halls
 
 
+def process_invigilators(invigilator_sheet: FileStorage) -> pd.DataFrame:
+    """
+    Reads the faculties available to invigilate each (Date, SlotNo).
+    """
+    headers = ["FacultyID", "Date", "SlotNo"]
+    return ingest.read_sheet(invigilator_sheet, "invigilators", headers,
+                             dtypes={"FacultyID": "uint32",
+                                     "SlotNo": "uint8"},
+                             dates=["Date"])
+
+
 def put_attendance(
     db_connector: Connection,
     cursor: Cursor,
-    plan: pd.DataFrame
-) -> None:
-    students = []
-    for _, data in plan.iterrows():
-        students.append((
-            data.StudentID,
-            data.Date,
-            data.SlotNo,
-            data.CourseCode,
-            data.ClassID,
-            data.Seat,
-            True
-        ))
-    add_att.add_attendances(db_connector, cursor, students)
+    plan: pd.DataFrame, *,
+    chunk_size: Optional[int] = 5000,
+    local_infile: bool = False
+) -> list[float]:
+    """
+    Stores the plan in the `attendance` table, marking everyone present,
+    and builds the `exam_roster` of its (Date, SlotNo) groups in the
+    same transaction.
+
+    Rows are inserted ``chunk_size`` at a time in one transaction, or in
+    a single ``LOAD DATA LOCAL INFILE`` when ``local_infile`` is set.
+    Returns the seconds spent on each chunk.
+    """
+    columns = ["StudentID", "Date", "SlotNo", "CourseCode", "ClassID", "Seat"]
+    students = plan[columns].assign(Present=True)
+    students["Date"] = students["Date"].dt.date
+    groups = list(students[["Date", "SlotNo"]].drop_duplicates()
+                  .astype(object).itertuples(index=False, name=None))
+    if local_infile:
+        timings = [add_att.load_attendances(
+            db_connector, cursor,
+            students.assign(Present=1).to_csv(header=False, index=False,
+                                              lineterminator="\n"),
+            groups=groups
+        )]
+    else:
+        timings = add_att.add_attendances(
+            db_connector, cursor,
+            list(students.astype(object).itertuples(index=False, name=None)),
+            chunk_size=chunk_size, groups=groups
+        )
+    for seconds in timings:
+        metrics.observe("attendance_chunk_duration_seconds", seconds,
+                        method="load" if local_infile else "insert")
+    return timings
+
 
+def _seat_blocks(capacity: np.ndarray,
+                 start: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Lays out the seats of a slot's halls as consecutive blocks.
+
+    Halls are visited round-robin from ``start``; the first round fills
+    the first half of every hall and the second round fills the rest.
+    Returns the hall position, the first seat and the size of each block.
+    """
+    order = np.roll(np.arange(len(capacity)), -start)
+    cap = capacity[order]
+    half = cap // 2
+    return (np.concatenate([order, order]),
+            np.concatenate([np.zeros_like(half), half]),
+            np.concatenate([half, cap - half]))
+
+
+def _spread_blocks(capacity: np.ndarray, counts: np.ndarray,
+                   seed: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Spreads a slot over all its halls with :func:`_seat_blocks`,
+    from a start hall picked with ``seed``.
+    """
+    return _seat_blocks(capacity,
+                        random.Random(seed).randint(0, len(capacity) - 1))
+
+
+def _packed_blocks(capacity: np.ndarray, counts: np.ndarray,
+                   seed: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Packs the sections of a slot, of ``counts`` students each, into as
+    few halls as possible.
+
+    Like :func:`_seat_blocks`, no hall gets more than half its seats
+    unless the halves of all halls cannot hold the slot, when halls are
+    filled whole. Open halls are kept sorted by seats left, ties broken
+    in an order drawn from ``seed``. A section goes whole into the open
+    hall with the fewest seats left that holds it (best fit), else into
+    the smallest unopened hall that holds it; failing both it fills the
+    open, or else the largest unopened, hall with the most seats left
+    and carries on. Returns the blocks as :func:`_seat_blocks` does.
+
+    Each pick is O(H) in the H halls of the slot, not O(log H): the
+    fit is found by bisection, but popping it from and inserting it into
+    the sorted lists shifts their tails. A heap cannot find the smallest
+    hall that still holds a section, which best fit needs, and for the
+    few hundred halls of a slot the shift is a short memmove.
+    """
+    limit = capacity // 2
+    if limit.sum() < counts.sum():
+        limit = capacity
+    rank = random.Random(seed).sample(range(len(capacity)), len(capacity))
+    closed = sorted((cap, rank[pos], pos)
+                    for pos, cap in enumerate(limit.tolist()) if cap)
+    opened: list[tuple[int, int, int]] = []
+    used = [0] * len(capacity)
+    hall, first, size = [], [], []
+    for count in counts.tolist():
+        while count:
+            if (fit := bisect.bisect_left(opened, (count,))) < len(opened):
+                left, tie, pos = opened.pop(fit)
+            elif closed and closed[-1][0] >= count:
+                left, tie, pos = closed.pop(bisect.bisect_left(closed,
+                                                               (count,)))
+            elif opened:
+                left, tie, pos = opened.pop()
+            else:
+                left, tie, pos = closed.pop()
+            take = min(count, left)
+            hall.append(pos)
+            first.append(used[pos])
+            size.append(take)
+            used[pos] += take
+            count -= take
+            if left > take:
+                bisect.insort(opened, (left - take, tie, pos))
+    return (np.array(hall, dtype=np.int64), np.array(first, dtype=np.int64),
+            np.array(size, dtype=np.int64))
+
+
+STRATEGIES: dict[str, Callable[[np.ndarray, np.ndarray, int],
+                               tuple[np.ndarray, np.ndarray, np.ndarray]]] = {
+    "spread": _spread_blocks,
+    "packed": _packed_blocks
+}
+
+
+def _order_sections(grouped: pd.DataFrame) -> pd.DataFrame:
+    """
+    Orders the sections of a slot programme-wise, programmes being
+    ranked by their first course code.
+    """
+    keys = ["Degree", "Stream", "Year"]
+    ranks = grouped.sort_values(by=["CourseCode"], kind="stable") \
+        .drop_duplicates(subset=keys)[keys]
+    ranks["Rank"] = np.arange(len(ranks))
+    ordered = grouped.merge(ranks, how="left", on=keys, sort=False)
+    return ordered.sort_values(by="Rank", kind="stable") \
+        .drop(columns="Rank")
+
+
+def _allocate_group(ds: tuple, grouped: pd.DataFrame, halls: pd.DataFrame,
+                    seed: int, strategy: str = "spread"
+                    ) -> Optional[dict[str, np.ndarray]]:
+    """
+    Seats the students of one (Date, SlotNo) group in ``halls``, the
+    group's own halls, in the blocks laid out by ``strategy`` with
+    ``seed``, returning the plan columns of the group or ``None`` if it
+    has no students.
+    """
+    sections = _order_sections(grouped)
+    counts = sections["Students"].str.len().to_numpy(dtype=np.int64)
+    total = int(counts.sum())
+    if not total:
+        return None
+
+    capacity = halls["Capacity"].to_numpy(dtype=np.int64)
+    assert capacity.sum() >= total, "Insufficient no. of seats!"
+    hall, first, size = STRATEGIES[strategy](capacity, counts, seed)
+    ends = np.cumsum(size)
+    pos = np.arange(total)
+    block = np.searchsorted(ends, pos, side="right")
+    sec = np.repeat(np.arange(len(sections)), counts)
+    reg_nos, student_ids = zip(*chain.from_iterable(sections["Students"]))
+
+    part = {
+        "Date": np.repeat(np.array([ds[0]], dtype=object), total),
+        "SlotNo": np.full(total, ds[1]),
+        "ClassID": halls["ID"].to_numpy()[hall[block]],
+        "RoomNo": halls["RoomNo"].to_numpy()[hall[block]],
+        "Seat": first[block] + pos - (ends - size)[block] + 1,
+        "RegNo": np.array(reg_nos, dtype=object),
+        "StudentID": np.array(student_ids)
+    }
+    for col in ("Degree", "Stream", "Year", "Section", "CourseCode"):
+        part[col] = sections[col].to_numpy()[sec]
+    return part
+
+
+@metrics.stage("allocation")
+def allocate_seats(
+    schedules: pd.DataFrame,
+    halls: pd.DataFrame, *,
+    progress: Optional[Callable[[tuple, int, int], None]] = None,
+    strategy: str = "spread"
+) -> pd.DataFrame:
+    """
+    Assigns every student of each (Date, SlotNo) group to a hall and seat.
+
+    Students of a slot are laid out one after another and mapped onto
+    the seat blocks of ``strategy`` with their cumulative offsets, so
+    each group is placed in one pass and the plan is built once at the
+    end. ``"spread"`` fills the halves of every hall round-robin, see
+    :func:`_seat_blocks`; ``"packed"`` uses as few halls as it can, see
+    :func:`_packed_blocks`. ``progress`` is called with each finished
+    group, the number of groups done and the total.
+    """
+    columns = ["Date", "SlotNo", "Degree", "Stream", "Year", "Section",
+               "ClassID", "RoomNo", "CourseCode", "Seat", "RegNo",
+               "StudentID"]
+    parts: list[dict[str, np.ndarray]] = []
+    groups = schedules.groupby(["Date", "SlotNo"], observed=True)
+    for done, (ds, grouped) in enumerate(groups, start=1):
+        part = _allocate_group(
+            ds, grouped,
+            halls[(halls["Date"] == ds[0]) & (halls["SlotNo"] == ds[1])],
+            random.getrandbits(32), strategy
+        )
+        if part is not None:
+            parts.append(part)
+        if progress:
+            progress(ds, done, groups.ngroups)
 
-def generate_hallplan(db_connector: Connection, cursor: Cursor, /, *,
-                      schedules: pd.DataFrame = pd.DataFrame(),
-                      halls: pd.DataFrame = pd.DataFrame()) -> pd.DataFrame:
-    plan = pd.DataFrame(columns=["Date", "SlotNo", "Degree", "Stream", "Year",
-                                 "Section", "ClassID", "RoomNo", "CourseCode",
-                                 "Seat", "RegNo", "StudentID"])
     to_types = {
         "SlotNo": "uint8",
         "Year": "uint16",
@@ -183,53 +400,368 @@ def generate_hallplan(db_connector: Connection, cursor: Cursor, /, *,
         "Seat": "uint8",
         "StudentID": "uint32"
     }
-    for ds, grouped in schedules.groupby(["Date", "SlotNo"]):
-        prg_years = []
-        _halls = halls.query("Date == @ds[0] and SlotNo == @ds[1]")
-        n = len(_halls)
-        hall_idx = randint(0, n-1)
-        for _, row in grouped.sort_values(by=["CourseCode"]).iterrows():
-            prg_year = [row["Degree"], row["Stream"], row["Year"]]
-            if prg_year not in prg_years:
-                prg_years.append(prg_year)
-        for prg_year in prg_years:
-            d, s, y = prg_year
-            prg_yr_schedule = grouped.query("Degree == @d and Stream == @s "
-                                            "and Year == @y")
-            for _, section in prg_yr_schedule.iterrows():
-                students = section.Students
-                course_code = section.CourseCode
-                no_of_students = len(students)
-                while no_of_students:
-                    _idx = _halls.index[hall_idx]
-                    hall = halls.loc[_idx]
-                    cap = hall.Capacity
-                    half = cap // 2
-                    occupy = min(no_of_students, abs(half - hall.Seat))
-
-                    assert cap, "Insufficient no. of seats!"
-                    for i in range(occupy):
-                        plan = pd.concat([plan, pd.DataFrame([[
-                                *ds, *prg_year, section.Section,
-                                hall.ID, hall.RoomNo, course_code,
-                                hall.Seat + i + 1, *students[i]
-                            ]], columns=plan.columns)],
-                            axis=0, ignore_index=True)
-                    students = students[occupy:]
-                    no_of_students = len(students)
-                    seat = hall.Seat + occupy
-
-                    halls.at[_idx, "Capacity"] = cap - seat
-                    halls.at[_idx, "Seat"] = seat
-                    if seat in (half, cap):
-                        hall_idx = (hall_idx + 1) % n
-
+    if parts:
+        plan = pd.DataFrame({col: np.concatenate([part[col]
+                                                  for part in parts])
+                             for col in columns}, copy=False)
+    else:
+        plan = pd.DataFrame(columns=columns)
     plan["Date"] = pd.to_datetime(plan["Date"], format="%d/%m/%Y")
-    plan = plan.astype(to_types, copy=False)
+    return plan.astype(to_types, copy=False)
+
+
+def assign_invigilators(plan: pd.DataFrame,
+                        availability: pd.DataFrame, *,
+                        assigned: Optional[pd.DataFrame] = None,
+                        per_hall: int = 1,
+                        seed: Optional[int] = None) -> pd.DataFrame:
+    r"""
+    Assigns ``per_hall`` invigilators to every hall used by ``plan``.
+
+    Parameters
+    ==========
+    - **plan**: DataFrame
+      The plan whose (Date, SlotNo, ClassID) halls need invigilators.
+
+    - **availability**: DataFrame
+      The (FacultyID, Date, SlotNo) a faculty is free for,
+      as read by :func:`process_invigilators`.
+
+    - **assigned**: Optional[DataFrame]
+      Invigilators already kept for other slots, counted towards
+      the faculties' duties and the table's uniqueness rules.
+
+    - **seed**: Optional[int]
+      Breaks ties between faculties with as many duties.
+
+    Slots are taken in order and each hall gets the free faculty with
+    the fewest duties so far, from a heap, skipping any who already
+    watched that hall on the same date. So no faculty is in two halls
+    of a slot, or twice in a hall on a date, and duties stay even.
+    Returns the (FacultyID, Date, SlotNo, ClassID) assignments.
+    Raises ``ValueError`` when a slot has too few free faculties.
+    """
+    keys = ["Date", "SlotNo"]
+    columns = ["FacultyID", *keys, "ClassID"]
+    halls = plan[[*keys, "ClassID"]].drop_duplicates() \
+        .sort_values([*keys, "ClassID"])
+    free = availability.drop_duplicates(["FacultyID", *keys]) \
+        .groupby(keys, observed=True)["FacultyID"].agg(list)
+
+    load: dict[int, int] = {}
+    watched: set[tuple[pd.Timestamp, int, int]] = set()
+    if assigned is not None:
+        planned = pd.MultiIndex.from_frame(halls[keys])
+        kept = assigned[~pd.MultiIndex.from_frame(assigned[keys])
+                        .isin(planned)]
+        for faculty_id, date, class_id in zip(kept["FacultyID"].tolist(),
+                                              kept["Date"],
+                                              kept["ClassID"].tolist()):
+            load[faculty_id] = load.get(faculty_id, 0) + 1
+            watched.add((pd.Timestamp(date), class_id, faculty_id))
+
+    rng = random.Random(seed)
+    tie: dict[int, float] = {}
+    rows: list[tuple[int, pd.Timestamp, int, int]] = []
+    for (date, slot_no), classes in halls.groupby(keys, observed=True,
+                                                  sort=False)["ClassID"]:
+        date = pd.Timestamp(date)
+        heap = [(load.get(faculty_id, 0),
+                 tie.setdefault(faculty_id, rng.random()), faculty_id)
+                for faculty_id in free.get((date, slot_no), [])]
+        heapq.heapify(heap)
+        for class_id in classes.tolist():
+            for _ in range(per_hall):
+                skipped = []
+                while heap and (date, class_id, heap[0][2]) in watched:
+                    skipped.append(heapq.heappop(heap))
+                if not heap:
+                    raise ValueError("Insufficient no. of invigilators on "
+                                     f"{date:%d/%m/%Y} slot {slot_no}!")
+                duties, _, faculty_id = heapq.heappop(heap)
+                load[faculty_id] = duties + 1
+                watched.add((date, class_id, faculty_id))
+                rows.append((faculty_id, date, slot_no, class_id))
+                for faculty in skipped:
+                    heapq.heappush(heap, faculty)
+
+    return pd.DataFrame(rows, columns=columns).astype({
+        "FacultyID": "uint32", "Date": "datetime64[ns]",
+        "SlotNo": "uint8", "ClassID": "uint32"
+    })
+
+
+def put_invigilators(db_connector: Connection, cursor: Cursor,
+                     plan: pd.DataFrame,
+                     invigilators: pd.DataFrame) -> None:
+    """
+    Replaces the invigilators of every (Date, SlotNo) of ``plan`` with
+    ``invigilators``, in one batched transaction.
+    """
+    keys = ["Date", "SlotNo"]
+    groups = plan[keys].drop_duplicates()
+    rows = invigilators[["FacultyID", *keys, "ClassID"]].copy()
+    for frame in (groups, rows):
+        frame["Date"] = pd.to_datetime(frame["Date"]).dt.date
+    update_att.replace_invigilators(
+        db_connector, cursor,
+        groups=list(groups.astype(object).itertuples(index=False,
+                                                     name=None)),
+        invigilators=list(rows.astype(object).itertuples(index=False,
+                                                         name=None))
+    )
+
+
+def hall_usage(plan: pd.DataFrame, halls: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reports, for each (Date, SlotNo) group of ``plan``, the halls used
+    out of those available and the share of the used seats filled.
+    """
+    keys = ["Date", "SlotNo"]
+    types = {"Date": "datetime64[ns]", "SlotNo": "int64", "ClassID": "int64"}
+    plan = plan[[*keys, "ClassID"]].astype(types)
+    halls = halls.rename(columns={"ID": "ClassID"})[
+        [*keys, "ClassID", "Capacity"]
+    ].astype(types)
+    used = plan.drop_duplicates().merge(halls, how="left",
+                                        on=[*keys, "ClassID"])
+    usage = pd.DataFrame({
+        "Halls": halls.groupby(keys).size(),
+        "HallsUsed": used.groupby(keys).size(),
+        "Capacity": used.groupby(keys)["Capacity"].sum(),
+        "Students": plan.groupby(keys).size()
+    }).dropna(subset=["Students"]).fillna(0).astype("int64")
+    usage["Utilization"] = (
+        usage["Students"] / usage["Capacity"].where(usage["Capacity"] > 0)
+    ).fillna(0.0)
+    return usage.reset_index()
+
+
+@metrics.stage("summary")
+def summarize_hallplan(plan: pd.DataFrame) -> list[dict]:
+    """
+    Summarizes a plan as the register number range of every section
+    in each of its halls, one entry per (Date, SlotNo, section).
+    """
+    keys = ["Date", "SlotNo", "Year", "Degree", "Stream", "Section"]
+    sections = plan.groupby(keys, observed=True).agg(
+        CourseCode=("CourseCode", "first"),
+        Halls=("RoomNo", "nunique")
+    ).reset_index()
+    halls = plan.groupby([*keys, "RoomNo"], observed=True).agg(
+        _min=("RegNo", "min"),
+        _max=("RegNo", "max")
+    ).reset_index().sort_values([*keys, "_min"])
+
+    stream = sections["Stream"].astype(str)
+    description = (sections["Year"].astype(str) + " "
+                   + sections["Degree"].astype(str) + " "
+                   + np.where(stream.isin(["", "NULL"]), "",
+                              "(" + stream + ") ")
+                   + sections["Section"].astype(str) + " ")
+    ends = np.cumsum(sections["Halls"].to_numpy())
+    rooms = halls["RoomNo"].tolist()
+    ranges = (halls["_min"].astype(str) + "-"
+              + halls["_max"].astype(str)).tolist()
+    return [{
+        "date": date,
+        "slot_no": slot_no,
+        "course_code": course_code,
+        "description": desc,
+        "halls": dict(zip(rooms[end - n:end], ranges[end - n:end]))
+    } for date, slot_no, course_code, desc, n, end in zip(
+        sections["Date"].dt.strftime("%d/%m/%Y").tolist(),
+        sections["SlotNo"].astype(int).tolist(),
+        sections["CourseCode"].tolist(),
+        description.tolist(),
+        sections["Halls"].tolist(),
+        ends.tolist()
+    )]
+
+
+def generate_hallplan(
+    db_connector: Connection, cursor: Cursor, /, *,
+    schedules: pd.DataFrame = pd.DataFrame(),
+    halls: pd.DataFrame = pd.DataFrame(),
+    progress: Optional[Callable[[tuple, int, int], None]] = None,
+    strategy: str = "spread",
+    repair: bool = False,
+    local_infile: bool = False
+) -> pd.DataFrame:
+    plan = allocate_seats(schedules, halls, progress=progress,
+                          strategy=strategy)
+    if repair:
+        plan = seating.repair(plan, halls)
     try:
-        put_attendance(db_connector, cursor, plan)
+        put_attendance(db_connector, cursor, plan, local_infile=local_infile)
     except pymysql.err.IntegrityError as exception:
         print(exception)
         raise
 
     return plan
+
+
+def _stored_plan(cursor: Cursor) -> pd.DataFrame:
+    """
+    Reads the seats and presence of the `attendance` table, as tuples
+    through a server-side cursor.
+    """
+    with metrics.TimedCursor(
+            cursor.connection.cursor(pymysql.cursors.SSCursor)) as stream:
+        stream.execute("""SELECT `date`, `slot_no`, `student_id`,
+                       `course_code`, `class_id`, `seat`, `is_present`
+                       FROM `attendance`""")
+        stored = pd.DataFrame.from_records(
+            stream.fetchall(),
+            columns=["Date", "SlotNo", "StudentID", "CourseCode",
+                     "ClassID", "Seat", "Present"]
+        )
+    return stored.astype({"Date": "datetime64[ns]", "SlotNo": "int64",
+                          "StudentID": "int64", "CourseCode": str,
+                          "ClassID": "int64", "Seat": "int64",
+                          "Present": bool})
+
+
+@metrics.stage("affected_groups")
+def _affected_groups(stored: pd.DataFrame, schedules: pd.DataFrame,
+                     halls: pd.DataFrame) -> pd.MultiIndex:
+    """
+    Finds the (Date, SlotNo) groups whose stored plan no longer fits:
+    a student or course was added or dropped, or a seat is no longer
+    available in the new halls.
+    """
+    keys = ["Date", "SlotNo"]
+
+    def normalize(frame: pd.DataFrame) -> pd.DataFrame:
+        return frame.astype({"Date": "datetime64[ns]", "SlotNo": "int64"})
+
+    new = schedules[[*keys, "CourseCode", "Students"]] \
+        .explode("Students").dropna(subset=["Students"])
+    new["StudentID"] = new["Students"].str[1].astype("int64")
+    new = normalize(new.drop(columns="Students"))
+    old = stored[[*keys, "StudentID", "CourseCode", "ClassID", "Seat"]]
+
+    students = new.merge(old, how="outer", indicator=True,
+                         on=[*keys, "StudentID", "CourseCode"])
+    changed = students.loc[students["_merge"] != "both", keys]
+    seats = old.merge(
+        normalize(halls.rename(columns={"ID": "ClassID"})[
+            [*keys, "ClassID", "Capacity"]
+        ]), how="left", on=[*keys, "ClassID"]
+    )
+    lost = seats.loc[~(seats["Seat"] <= seats["Capacity"]), keys]
+    return pd.MultiIndex.from_frame(pd.concat([changed, lost])
+                                    .drop_duplicates())
+
+
+def _keep_seats(plan: pd.DataFrame, stored: pd.DataFrame,
+                halls: pd.DataFrame) -> pd.DataFrame:
+    """
+    Gives each student of ``plan`` who sat the same course in ``stored``
+    their stored hall, seat and presence, where that seat is still in
+    ``halls``. The others keep the seat ``plan`` chose for them if it is
+    free, or else take the free seats left, in hall order.
+    """
+    keys = ["Date", "SlotNo"]
+    student = [*keys, "StudentID", "CourseCode"]
+    seat = [*keys, "ClassID", "Seat"]
+    rooms = halls.rename(columns={"ID": "ClassID"})[
+        [*keys, "ClassID", "RoomNo", "Capacity"]
+    ].astype({"Date": "datetime64[ns]", "SlotNo": "int64",
+              "ClassID": "int64"})
+
+    plan = plan.astype({"Date": "datetime64[ns]"})
+    types = plan.dtypes
+    old = stored[[*student, "ClassID", "Seat", "Present"]].merge(
+        rooms, how="left", on=[*keys, "ClassID"]
+    ).rename(columns={"ClassID": "OldClassID", "Seat": "OldSeat",
+                      "RoomNo": "OldRoomNo"})
+    old.loc[~(old["OldSeat"] <= old["Capacity"]), "OldSeat"] = np.nan
+    merged = plan.astype({"SlotNo": "int64", "StudentID": "int64",
+                          "ClassID": "int64", "Seat": "int64"}) \
+        .merge(old.drop(columns="Capacity"), how="left", on=student)
+    kept = merged["OldSeat"].notna()
+    merged.loc[kept, ["ClassID", "RoomNo", "Seat"]] = merged.loc[
+        kept, ["OldClassID", "OldRoomNo", "OldSeat"]
+    ].to_numpy()
+    merged = merged.astype({"ClassID": "int64", "Seat": "int64"})
+
+    taken = pd.MultiIndex.from_frame(merged.loc[kept, seat])
+    moved = merged.index[~kept & pd.MultiIndex.from_frame(merged[seat])
+                         .isin(taken)]
+    if len(moved):
+        free = rooms.loc[rooms.index.repeat(rooms["Capacity"]),
+                         [*keys, "ClassID", "RoomNo"]]
+        free["Seat"] = free.groupby([*keys, "ClassID"]).cumcount() + 1
+        free = free[~pd.MultiIndex.from_frame(free[seat])
+                    .isin(pd.MultiIndex.from_frame(merged[seat]))]
+        free["Rank"] = free.groupby(keys).cumcount()
+        movers = merged.loc[moved, keys].assign(
+            Rank=merged.loc[moved].groupby(keys).cumcount().to_numpy()
+        )
+        placed = movers.reset_index().merge(free, how="left",
+                                            on=[*keys, "Rank"]) \
+            .set_index("index")
+        merged.loc[moved, ["ClassID", "RoomNo", "Seat"]] = \
+            placed[["ClassID", "RoomNo", "Seat"]].to_numpy()
+
+    merged["Present"] = merged["Present"].astype("boolean").fillna(True) \
+        .astype(bool)
+    return merged.drop(columns=["OldClassID", "OldRoomNo", "OldSeat"]) \
+        .astype(types)
+
+
+def replan_hallplan(
+    db_connector: Connection, cursor: Cursor, /, *,
+    schedules: pd.DataFrame = pd.DataFrame(),
+    halls: pd.DataFrame = pd.DataFrame(),
+    progress: Optional[Callable[[tuple, int, int], None]] = None,
+    strategy: str = "spread",
+    repair: bool = False
+) -> pd.DataFrame:
+    """
+    Re-plans only the (Date, SlotNo) groups affected by the new
+    ``schedules`` and ``halls``, and rewrites only the attendance rows
+    that changed; other slots keep their seats and attendance.
+    Within an affected group, students keep their stored seat and
+    presence where the seat is still available, see :func:`_keep_seats`;
+    with ``repair``, neighbours of the same course are separated by
+    :func:`seating.repair` among the others.
+    Invigilators of halls left empty are dropped with the attendance.
+    Returns the new plan of the affected groups.
+    """
+    stored = _stored_plan(cursor)
+    affected = _affected_groups(stored, schedules, halls)
+    keys = ["Date", "SlotNo"]
+
+    def in_affected(frame: pd.DataFrame) -> pd.Series:
+        groups = pd.MultiIndex.from_frame(frame[keys].astype(
+            {"Date": "datetime64[ns]", "SlotNo": "int64"}
+        ))
+        return pd.Series(groups.isin(affected), index=frame.index)
+
+    plan = allocate_seats(schedules[in_affected(schedules)], halls,
+                          progress=progress, strategy=strategy)
+    if repair:
+        plan = seating.repair(plan, halls)
+    plan = _keep_seats(plan, stored[in_affected(stored)], halls)
+    row = ["Date", "SlotNo", "StudentID", "CourseCode", "ClassID", "Seat",
+           "Present"]
+    old = stored.loc[in_affected(stored), row]
+    new = plan[row].astype({"SlotNo": "int64", "StudentID": "int64",
+                            "CourseCode": str, "ClassID": "int64",
+                            "Seat": "int64"})
+    rows = old.merge(new, how="outer", on=row, indicator=True)
+    stale = rows.loc[rows["_merge"] == "left_only",
+                     [*keys, "StudentID"]].copy()
+    fresh = rows.loc[rows["_merge"] == "right_only", row].copy()
+    for frame in (stale, fresh):
+        frame["Date"] = frame["Date"].dt.date
+
+    update_att.replace_attendances(
+        db_connector, cursor,
+        stale=list(stale.astype(object).itertuples(index=False, name=None)),
+        fresh=list(fresh.astype(object).itertuples(index=False, name=None)),
+        groups=[(date.date(), int(slot_no)) for date, slot_no in affected]
+    )
+    return plan.drop(columns="Present")
@@ -0,0 +1,96 @@
+# Copyright 2025 Harikrishna Srinivasan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from Timetable.typehints import Cursor, Optional
+import threading
+
+"""
+Caches the hall plan summary shown on the `/hallplan` page.
+
+The `plan_versions` table counts the writes of the stored plan and of
+its presence marks, each stamped in the transaction of the write, so
+every process sees the same versions; a summary built for an older
+plan version is never served again.
+Summaries are immutable, so readers never need the lock.
+"""
+
+_lock = threading.Lock()
+_summary: Optional["Summary"] = None
+
+
+class Summary:
+    """
+    An immutable hall plan summary indexed by (date, slot_no).
+    """
+    __slots__ = ("version", "table", "dates", "slots", "_index")
+
+    def __init__(self, version: int, table: list[dict]) -> None:
+        self.version = version
+        self.table = tuple(table)
+        self.dates = list(dict.fromkeys(row["date"] for row in table))
+        self.slots = list(dict.fromkeys(row["slot_no"] for row in table))
+        index: dict[tuple[Optional[str], Optional[str]], list[dict]] = {}
+        for row in table:
+            date, slot_no = str(row["date"]), str(row["slot_no"])
+            for key in ((date, slot_no), (date, None),
+                        (None, slot_no), (None, None)):
+                index.setdefault(key, []).append(row)
+        self._index = {key: tuple(rows) for key, rows in index.items()}
+
+    def view(self, date: Optional[str] = None,
+             slot_no: Optional[str] = None) -> tuple[dict, ...]:
+        return self._index.get((date or None, slot_no or None), ())
+
+
+def version(cursor: Cursor, name: str = "plan") -> int:
+    """
+    Returns the stored version of the plan, or of its ``"presence"``.
+    """
+    cursor.execute("""SELECT `version` FROM `plan_versions`
+                   WHERE `name`=%s""", (name,))
+    row = cursor.fetchone()
+    return row["version"] if row else 0
+
+
+def stamp(cursor: Cursor, name: str = "plan") -> None:
+    """
+    Marks the stored plan, or its ``"presence"``, as changed within the
+    caller's transaction, invalidating the cached summary on commit.
+    """
+    cursor.execute("""UPDATE `plan_versions`
+                   SET `version`=`version`+1
+                   WHERE `name`=%s""", (name,))
+
+
+def get(version: int) -> Optional[Summary]:
+    summary = _summary
+    if summary and summary.version == version:
+        return summary
+    return None
+
+
+def put(version: int, table: list[dict]) -> Summary:
+    """
+    Publishes the summary built from the plan of ``version``.
+
+    A summary of an older plan than the one cached is returned to its
+    caller but not cached.
+    """
+    global _summary
+    summary = Summary(version, table)
+    with _lock:
+        if _summary is None or version >= _summary.version:
+            _summary = summary
+    return summary
@@ -0,0 +1,102 @@
+# Copyright 2025 Harikrishna Srinivasan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from Timetable.typehints import Response
+from collections.abc import Callable
+from datetime import date
+from flask import make_response, request
+from functools import wraps
+import gzip
+import hashlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+"""
+Answers repeated GETs of the pages built from the hall plan with
+``304 Not Modified``, and compresses the pages that are sent.
+
+A page's weak ETag hashes the version stamps it is built from, its
+URL and today's date, so an unchanged page is answered before any
+query but the version lookups is run. The plan versions are stored
+with the plan, so every process tags a page alike.
+"""
+
+MIN_SIZE = 1024
+
+def etag(*versions: object) -> str:
+    """
+    Returns the ETag of the current request's URL at ``versions``.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((versions, request.full_path,
+                        date.today().isoformat())).encode())
+    return digest.hexdigest()
+
+
+def compress(response: Response) -> Response:
+    """
+    Encodes a large HTML ``response`` with Brotli, when installed and
+    accepted, or else gzip.
+    """
+    if (response.status_code != 200 or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype != "text/html"):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    if len(body) < MIN_SIZE:
+        return response
+
+    accepted = request.accept_encodings
+    if brotli and accepted["br"]:
+        response.set_data(brotli.compress(body, quality=5))
+        response.content_encoding = "br"
+    elif accepted["gzip"]:
+        response.set_data(gzip.compress(body, compresslevel=6))
+        response.content_encoding = "gzip"
+    return response
+
+
+def conditional(*versions: Callable[[], object]
+                ) -> Callable[[Callable[..., object]],
+                              Callable[..., Response]]:
+    """
+    Makes a view revalidated on every GET and answered with 304 while
+    none of ``versions`` has changed, and compresses what it returns.
+    """
+    def decorate(view: Callable[..., object]) -> Callable[..., Response]:
+        @wraps(view)
+        def wrapper(*args: object, **kwargs: object) -> Response:
+            if request.method not in ("GET", "HEAD"):
+                return compress(make_response(view(*args, **kwargs)))
+
+            tag = etag(*(version() for version in versions))
+            if request.if_none_match.contains_weak(tag):
+                response = make_response("", 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(tag, weak=True)
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            response.vary.update(("Cookie", "Accept-Encoding"))
+            return compress(response)
+        return wrapper
+    return decorate
@@ -0,0 +1,168 @@
+# Copyright 2025 Harikrishna Srinivasan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from Timetable.typehints import FileStorage, Optional
+from collections.abc import Iterator, Mapping, Sequence
+from itertools import islice
+from pandas.api.types import union_categoricals
+import io
+import numpy as np
+import openpyxl
+import pandas as pd
+
+"""
+Reads the uploaded slots, schedules, halls and plan sheets
+chunk by chunk, validating every chunk as it is read.
+Sheets may be Excel workbooks, CSV or Parquet files.
+"""
+
+CHUNK_SIZE = 5000
+DATE_FORMAT = "%d/%m/%Y"
+
+
+def _excel_chunks(sheet: FileStorage | io.BytesIO, sheet_name: str,
+                  headers: list[str],
+                  chunk_size: int) -> Iterator[pd.DataFrame]:
+    workbook = openpyxl.load_workbook(sheet, read_only=True, data_only=True)
+    try:
+        rows = (row[:len(headers)] for row in workbook[sheet_name].iter_rows(
+            min_row=2, values_only=True
+        ) if any(value is not None for value in row))
+        while chunk := list(islice(rows, chunk_size)):
+            yield pd.DataFrame.from_records(chunk, columns=headers)
+    finally:
+        workbook.close()
+
+
+def _parquet_chunks(sheet: FileStorage | io.BytesIO, headers: list[str],
+                    chunk_size: int) -> Iterator[pd.DataFrame]:
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(sheet).iter_batches(batch_size=chunk_size):
+        chunk = batch.to_pandas()
+        chunk.columns = headers
+        yield chunk
+
+
+def _validate(chunk: pd.DataFrame, dtypes: Mapping[str, str],
+              dates: Sequence[str], keep_default_na: bool) -> pd.DataFrame:
+    for col in dates:
+        chunk[col] = pd.to_datetime(chunk[col], format=DATE_FORMAT)
+    for col, dtype in dtypes.items():
+        if dtype == "category":
+            continue
+
+        values = pd.to_numeric(chunk[col], errors="raise")
+        info = np.iinfo(dtype)
+        if values.isna().any() or (values % 1 != 0).any() \
+           or ((values < info.min) | (values > info.max)).any():
+            raise ValueError(f"{col} must be a whole number "
+                             f"from {info.min} to {info.max}")
+        chunk[col] = values.astype(dtype)
+    if not keep_default_na:
+        chunk = chunk.fillna("")
+    for col, dtype in dtypes.items():
+        if dtype == "category":
+            chunk[col] = chunk[col].astype("category")
+    return chunk
+
+
+def iter_sheet(sheet: FileStorage | io.BytesIO, /,
+               sheet_name: str, headers: list[str], *,
+               dtypes: Optional[Mapping[str, str]] = None,
+               dates: Sequence[str] = (),
+               keep_default_na: bool = True,
+               chunk_size: int = CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    r"""
+    Yields the rows of ``sheet`` in validated chunks of ``chunk_size``.
+
+    Parameters
+    ==========
+    - **sheet**: FileStorage | BytesIO
+      An Excel workbook, CSV or Parquet file, told apart by its content.
+
+    - **sheet_name**: str
+      The worksheet to read from an Excel workbook.
+
+    - **headers**: list[str]
+      Names of the columns, in order.
+
+    - **dtypes**: Optional[Mapping[str, str]]
+      Integer types the columns must fit in, whole numbers only,
+      or ``"category"``.
+
+    - **dates**: Sequence[str]
+      Columns holding dd/mm/yyyy dates.
+
+    - **keep_default_na**: bool
+      Whether empty cells stay missing rather than becoming ``""``.
+
+    Raises
+    ======
+    - **ValueError**: On the first chunk holding an invalid row,
+      naming the rows of the chunk.
+    """
+    magic = sheet.read(4)
+    sheet.seek(0)
+    if magic.startswith(b"PK"):
+        chunks = _excel_chunks(sheet, sheet_name, headers, chunk_size)
+    elif magic == b"PAR1":
+        chunks = _parquet_chunks(sheet, headers, chunk_size)
+    else:
+        chunks = pd.read_csv(sheet, names=headers, header=0,
+                             keep_default_na=keep_default_na,
+                             chunksize=chunk_size)
+
+    dtypes = dtypes or {}
+    start = 2
+    for chunk in chunks:
+        end = start + len(chunk) - 1
+        try:
+            chunk = _validate(chunk.reset_index(drop=True), dtypes, dates,
+                              keep_default_na)
+        except (TypeError, ValueError) as exception:
+            raise ValueError(f"Invalid {sheet_name} in rows "
+                             f"{start}-{end}: {exception}") from exception
+        yield chunk
+        start = end + 1
+
+
+def read_sheet(sheet: FileStorage | io.BytesIO, /,
+               sheet_name: str, headers: list[str], *,
+               dtypes: Optional[Mapping[str, str]] = None,
+               dates: Sequence[str] = (),
+               keep_default_na: bool = True,
+               chunk_size: int = CHUNK_SIZE) -> pd.DataFrame:
+    """
+    Reads the whole of ``sheet`` through :func:`iter_sheet`.
+
+    Every chunk is cast to its compact types as it is read, so only one
+    chunk is held as raw text at a time; category columns are merged
+    with the union of the chunks' categories.
+    """
+    dtypes = dtypes or {}
+    chunks = list(iter_sheet(sheet, sheet_name, headers, dtypes=dtypes,
+                             dates=dates, keep_default_na=keep_default_na,
+                             chunk_size=chunk_size))
+    if not chunks:
+        return pd.DataFrame(columns=headers).astype(dtypes)
+
+    categories = [col for col, dtype in dtypes.items()
+                  if dtype == "category"]
+    frame = pd.concat([chunk.drop(columns=categories) for chunk in chunks],
+                      ignore_index=True)
+    for col in categories:
+        frame[col] = union_categoricals([chunk[col] for chunk in chunks])
+    return frame[list(chunks[0].columns)]
@@ -0,0 +1,103 @@
+# Copyright 2025 Harikrishna Srinivasan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from Timetable.typehints import Optional
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import secrets
+import threading
+import traceback
+
+"""
+Runs long tasks, such as hall plan generation, in background workers
+and keeps their progress for polling.
+"""
+
+MAX_JOBS = 100
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hallplan")
+_jobs: OrderedDict[str, "Job"] = OrderedDict()
+_lock = threading.Lock()
+
+
+class Job:
+    """
+    The progress of a background task.
+    """
+    __slots__ = ("id", "status", "stage", "groups", "done", "total", "error",
+                 "report")
+
+    def __init__(self, job_id: str) -> None:
+        self.id = job_id
+        self.status = "queued"
+        self.stage = ""
+        self.groups: list[tuple[str, int]] = []
+        self.done = 0
+        self.total = 0
+        self.error: Optional[str] = None
+        self.report: Optional[dict[str, object]] = None
+
+    def advance(self, date_slot: tuple[datetime, int],
+                done: int, total: int) -> None:
+        """
+        Records a completed (Date, SlotNo) group.
+        """
+        date, slot_no = date_slot
+        self.groups.append((date.strftime("%d/%m/%Y"), int(slot_no)))
+        self.done, self.total = done, total
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "done": self.done,
+            "total": self.total,
+            "groups": list(self.groups),
+            "error": self.error,
+            "report": self.report
+        }
+
+
+def _run(job: Job, task: Callable[[Job], None]) -> None:
+    job.status = "running"
+    try:
+        task(job)
+    except Exception as exception:
+        traceback.print_exc()
+        job.status = "failed"
+        job.error = str(exception)
+    else:
+        job.status = "done"
+
+
+def submit(task: Callable[[Job], None]) -> Job:
+    """
+    Queues ``task`` on the worker pool, returning its job.
+    Only the latest ``MAX_JOBS`` jobs are kept for polling.
+    """
+    job = Job(secrets.token_hex(8))
+    with _lock:
+        _jobs[job.id] = job
+        while len(_jobs) > MAX_JOBS:
+            _jobs.popitem(last=False)
+    _executor.submit(_run, job, task)
+    return job
+
+
+def get(job_id: str) -> Optional[Job]:
+    return _jobs.get(job_id)
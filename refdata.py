@@ -0,0 +1,150 @@
+# Copyright 2025 Harikrishna Srinivasan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from Timetable.typehints import Cursor, Optional
+from Timetable.show_data import get_building_id, get_school_id
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from typing import Any
+import fetch_data
+import pandas as pd
+import threading
+
+"""
+Caches reference data, i.e. classes, schools' buildings and
+section rosters, shared by the sheet processing and the routes.
+
+Whole tables are loaded with one query; per-key entries are kept
+in a bounded LRU. Everything cached before the last `stamp()`
+is reloaded on next use.
+"""
+
+MAX_ENTRIES = 1024
+
+_lock = threading.Lock()
+_version = 0
+_tables: dict[str, tuple[int, dict]] = {}
+_entries: OrderedDict[tuple[str, Hashable], tuple[int, object]] = \
+    OrderedDict()
+
+
+def stamp() -> int:
+    """
+    Marks the reference data as changed, invalidating the cache.
+    """
+    global _version
+    with _lock:
+        _version += 1
+        return _version
+
+
+def _table(name: str, cursor: Cursor,
+           load: Callable[[Cursor], dict]) -> dict:
+    version = _version
+    if (cached := _tables.get(name)) and cached[0] == version:
+        return cached[1]
+
+    data = load(cursor)
+    with _lock:
+        if version == _version:
+            _tables[name] = (version, data)
+    return data
+
+
+def _lookup(name: str, key: Hashable) -> tuple[bool, Any]:
+    with _lock:
+        if (cached := _entries.get((name, key))) and cached[0] == _version:
+            _entries.move_to_end((name, key))
+            return True, cached[1]
+    return False, None
+
+
+def _store(name: str, key: Hashable, value: object, version: int) -> None:
+    with _lock:
+        if version != _version:
+            return
+        _entries[(name, key)] = (version, value)
+        _entries.move_to_end((name, key))
+        while len(_entries) > MAX_ENTRIES:
+            _entries.popitem(last=False)
+
+
+def _load_classes(cursor: Cursor) -> dict[tuple[int, int], int]:
+    cursor.execute("""SELECT `id`, `building_id`, `room_no`
+                   FROM `classes`""")
+    return {(cls["building_id"], cls["room_no"]): cls["id"]
+            for cls in cursor.fetchall()}
+
+
+def class_id(cursor: Cursor, /,
+             building_id: Optional[int], room_no: int) -> Optional[int]:
+    return _table("classes", cursor, _load_classes).get(
+        (building_id, room_no)
+    )
+
+
+def class_ids(cursor: Cursor, /,
+              building_id: Optional[int], room_nos: pd.Series) -> pd.Series:
+    """
+    Maps every room number in ``room_nos`` to its class ID.
+    """
+    classes = _table("classes", cursor, _load_classes)
+    rooms = {room_no: classes.get((building_id, room_no))
+             for room_no in room_nos.unique().tolist()}
+    return room_nos.map(rooms)
+
+
+def building_id(cursor: Cursor, /, school: str) -> Optional[int]:
+    found, value = _lookup("buildings", school)
+    if found:
+        return value
+
+    version = _version
+    school_id = get_school_id(cursor, school=school)
+    value = get_building_id(cursor, school_id=school_id)[0]
+    _store("buildings", school, value, version)
+    return value
+
+
+def section_students(
+    cursor: Cursor, /, *,
+    programmes: Iterable[tuple[str, Optional[str], int]],
+    campus_id: Optional[int] = None
+) -> tuple[dict[str, int | str], ...]:
+    """
+    Returns :func:`fetch_data.get_section_students` for ``programmes``,
+    fetching only the programmes not cached yet, in one query.
+    """
+    rows: list[dict[str, int | str]] = []
+    missing = []
+    for programme in dict.fromkeys(programmes):
+        found, roster = _lookup("rosters", (campus_id, programme))
+        if found:
+            rows.extend(roster)
+        else:
+            missing.append(programme)
+
+    if missing:
+        version = _version
+        rosters: dict[tuple, list] = {programme: [] for programme in missing}
+        for row in fetch_data.get_section_students(cursor,
+                                                   programmes=missing,
+                                                   campus_id=campus_id):
+            rosters.setdefault((row["Degree"], row["Stream"] or None,
+                                int(row["Year"])), []).append(row)
+        for programme, roster in rosters.items():
+            _store("rosters", (campus_id, programme), tuple(roster), version)
+            rows.extend(roster)
+    return tuple(rows)
@@ -0,0 +1,222 @@
+# Copyright 2025 Harikrishna Srinivasan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from collections.abc import Sequence
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+"""
+Checks and repairs the seating constraints of a plan: no two students
+of the same course (or section) sit next to each other.
+
+Every hall is a grid of ``columns`` seats a row, numbered row by row.
+The seats taken by each course in a row form one ``uint64`` bitmask,
+so the neighbours of all halls of a plan are found with a few shifts
+and ANDs over a (course, row) array.
+"""
+
+COLUMNS = 8
+
+HALL = ["Date", "SlotNo", "ClassID"]
+
+_SHIFTS = {
+    "row": (0, 1),
+    "column": (1, 0),
+    "diagonal": (1, 1),
+    "antidiagonal": (1, -1)
+}
+
+
+def _masks(plan: pd.DataFrame, columns: int, by: Sequence[str]
+           ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the (hall, course) group of every student and the bitmask
+    of every group's row, along with the group's first row in ``plan``.
+    """
+    assert 0 < columns < 64, "Rows must have 1 to 63 seats"
+    group = plan.groupby([*HALL, *by], observed=True, sort=False) \
+        .ngroup().to_numpy()
+    seat = plan["Seat"].to_numpy(dtype=np.int64) - 1
+    row, col = np.divmod(seat, columns)
+    masks = np.zeros((group.max() + 1, row.max() + 2), dtype=np.uint64)
+    np.bitwise_or.at(masks, (group, row),
+                     np.left_shift(np.uint64(1), col.astype(np.uint64)))
+    _, first = np.unique(group, return_index=True)
+    return group, masks, first
+
+
+def _conflicts(masks: np.ndarray, kind: str) -> np.ndarray:
+    """
+    Sets bit ``c`` of row ``r`` where seat (r, c) and its ``kind``
+    neighbour, in the same row or the next, are of the same group.
+    """
+    rows, cols = _SHIFTS[kind]
+    below = masks[:, rows:] if rows else masks
+    here = masks[:, :masks.shape[1] - rows]
+    if cols > 0:
+        below = below >> np.uint64(cols)
+    elif cols < 0:
+        below = below << np.uint64(-cols)
+    return here & below
+
+
+def check(plan: pd.DataFrame, *,
+          columns: int = COLUMNS,
+          by: Sequence[str] = ("CourseCode",),
+          diagonal: bool = False) -> pd.DataFrame:
+    r"""
+    Finds every pair of neighbours of the same ``by`` group in a hall.
+
+    Parameters
+    ==========
+    - **plan**: DataFrame
+      A plan from :func:`generate_hallplan.allocate_seats`.
+
+    - **columns**: int
+      Seats in a row of every hall.
+
+    - **by**: Sequence[str]
+      Columns telling apart the students who must not sit together,
+      e.g. ``("CourseCode",)`` or ``("Degree", "Stream", "Year",
+      "Section")``.
+
+    - **diagonal**: bool
+      Whether diagonal neighbours count too.
+
+    Returns
+    =======
+    One row per violation, with the hall, the ``by`` columns, the
+    ``Seat`` and ``Neighbour`` seat numbers and the ``Kind`` of
+    neighbour: ``"row"``, ``"column"``, ``"diagonal"`` or
+    ``"antidiagonal"``.
+    """
+    by = list(by)
+    result = [*HALL, "RoomNo", *by, "Seat", "Neighbour", "Kind"]
+    if plan.empty:
+        return pd.DataFrame(columns=result)
+
+    _, masks, first = _masks(plan, columns, by)
+    bits = np.arange(columns, dtype=np.uint64)
+    kinds = ["row", "column", *(["diagonal", "antidiagonal"]
+                                if diagonal else [])]
+    found = []
+    for kind in kinds:
+        conflicts = _conflicts(masks, kind)
+        groups, rows = np.nonzero(conflicts)
+        if not len(groups):
+            continue
+        taken = (conflicts[groups, rows][:, None] >> bits) & np.uint64(1)
+        pair, cols = np.nonzero(taken)
+        seats = rows[pair] * columns + cols.astype(np.int64) + 1
+        step = _SHIFTS[kind][0] * columns + _SHIFTS[kind][1]
+        violations = plan.iloc[first[groups[pair]]][[*HALL, "RoomNo", *by]]
+        found.append(violations.assign(Seat=seats, Neighbour=seats + step,
+                                       Kind=kind))
+    if not found:
+        return pd.DataFrame(columns=result)
+    return pd.concat(found, ignore_index=True)[result]
+
+
+def _reseat(plan: pd.DataFrame, group: np.ndarray, columns: int,
+            rotate: bool) -> np.ndarray:
+    """
+    Deals the seats of every hall to its groups in turn, so that
+    consecutive seats go to different groups. With ``rotate``, each row
+    starts one seat further on, which keeps seats of the same column
+    apart when ``columns`` is a multiple of the number of groups.
+    """
+    hall = plan.groupby(HALL, observed=True, sort=False).ngroup().to_numpy()
+    rank = pd.Series(group).groupby(group).cumcount().to_numpy()
+    seat = plan["Seat"].to_numpy(dtype=np.int64)
+    row, col = np.divmod(seat - 1, columns)
+    place = (col - row) % columns if rotate else col
+    students = np.lexsort((group, rank, hall))
+    seats = np.lexsort((place, row, hall))
+    reseated = np.empty_like(seat)
+    reseated[students] = seat[seats]
+    return reseated
+
+
+def _checker(plan: pd.DataFrame, group: np.ndarray, capacity: np.ndarray,
+             columns: int) -> np.ndarray:
+    """
+    Seats every hall's students group after group on the "black" seats
+    of a checkerboard over all its ``capacity`` seats, then the "white"
+    ones, so a hall at most half full, or half full of each of two
+    groups, has no row or column neighbours of the same group.
+    """
+    hall = plan.groupby(HALL, observed=True, sort=False).ngroup().to_numpy()
+    cap = pd.Series(capacity).groupby(hall).first().to_numpy(dtype=np.int64)
+    owner = np.repeat(np.arange(len(cap)), cap)
+    seat = np.arange(len(owner)) - np.repeat(np.cumsum(cap) - cap, cap)
+    row, col = np.divmod(seat, columns)
+    seats = np.lexsort((col, row, (row + col) % 2, owner))
+    placed = np.arange(len(seats)) - np.repeat(np.cumsum(cap) - cap, cap)
+    taken = seats[placed < np.bincount(hall, minlength=len(cap))[owner]]
+    students = np.lexsort((group, hall))
+    reseated = np.empty(len(hall), dtype=np.int64)
+    reseated[students] = seat[taken] + 1
+    return reseated
+
+
+def repair(plan: pd.DataFrame, halls: Optional[pd.DataFrame] = None, *,
+           columns: int = COLUMNS,
+           by: Sequence[str] = ("CourseCode",),
+           diagonal: bool = False) -> pd.DataFrame:
+    """
+    Re-seats the students of every hall with violations, and keeps for
+    each hall whichever seating has the fewest violations: the students'
+    ``by`` groups interleaved over the seats they already take, or, with
+    the capacities of ``halls``, laid on a checkerboard of the whole
+    hall. Students never change halls, so the plan's halls and summary
+    stay the same.
+    """
+    by = list(by)
+    violations = check(plan, columns=columns, by=by, diagonal=diagonal)
+    if violations.empty:
+        return plan
+
+    def counts(frame: pd.DataFrame) -> pd.Series:
+        found = check(frame, columns=columns, by=by, diagonal=diagonal)
+        return found.groupby(HALL, observed=True).size()
+
+    faulty = pd.MultiIndex.from_frame(violations[HALL].drop_duplicates())
+    bad = pd.MultiIndex.from_frame(plan[HALL]).isin(faulty)
+    current = plan[bad]
+    group, _, _ = _masks(current, columns, by)
+    hall = pd.MultiIndex.from_frame(current[HALL])
+    seats = current["Seat"].to_numpy()
+    fewest = counts(current).reindex(faulty, fill_value=0)
+    candidates = [lambda: _reseat(current, group, columns, False),
+                  lambda: _reseat(current, group, columns, True)]
+    if halls is not None:
+        capacity = current[HALL].merge(
+            halls.rename(columns={"ID": "ClassID"})[[*HALL, "Capacity"]]
+            .astype(current[HALL].dtypes.to_dict()),
+            how="left", on=HALL
+        )["Capacity"].to_numpy()
+        candidates.append(lambda: _checker(current, group, capacity, columns))
+    for candidate in candidates:
+        reseated = candidate().astype(seats.dtype)
+        found = counts(current.assign(Seat=reseated)) \
+            .reindex(faulty, fill_value=0)
+        seats = np.where(hall.isin(found.index[found < fewest]),
+                         reseated, seats)
+        fewest = np.minimum(fewest, found)
+
+    repaired = plan.copy()
+    repaired.loc[bad, "Seat"] = seats
+    return repaired
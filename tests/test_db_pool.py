@@ -0,0 +1,44 @@
+# Copyright 2025 Harikrishna Srinivasan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import db_pool
+import pymysql
+import pytest
+
+
+def test_connections_open_with_the_login_settings(
+        monkeypatch: pytest.MonkeyPatch) -> None:
+    login = pymysql.connect(host="db.example", port=3307, user="exams",
+                            password="secret", database="timetable",
+                            autocommit=True, defer_connect=True)
+    opened = []
+    monkeypatch.setattr(pymysql, "connect",
+                        lambda **settings: opened.append(settings))
+
+    db_pool.connect_with(**db_pool.login_settings(login),
+                         local_infile=True)()
+    assert opened == [{"host": "db.example", "port": 3307,
+                       "unix_socket": None, "user": "exams",
+                       "password": b"secret", "database": "timetable",
+                       "charset": login.charset, "autocommit": True,
+                       "local_infile": True}]
+
+
+def test_a_closed_pool_opens_no_connections() -> None:
+    opened = []
+    pool = db_pool.ConnectionPool(lambda: opened.append(object()))
+    pool.close()
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+    assert not opened
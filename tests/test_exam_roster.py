@@ -0,0 +1,94 @@
+# Copyright 2025 Harikrishna Srinivasan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from benchmarks import memdb, synthetic
+import add_attendance
+import attendance
+import datetime
+import exam_roster
+import update_data
+
+
+def _roster_size(cursor: memdb.Cursor) -> int:
+    cursor.execute("""SELECT COUNT(*) AS `rows` FROM `exam_roster`""")
+    return cursor.fetchone()["rows"]
+
+
+def _database() -> tuple[memdb.Connection, memdb.Cursor]:
+    db_connector = memdb.Connection()
+    synthetic.University(students=40, halls=2).load(db_connector)
+    cursor = db_connector.cursor()
+    attendance.create_hallplan(db_connector, cursor)
+    add_attendance.add_slot(db_connector, cursor, no=1,
+                            start_time="09:00:00", end_time="12:00:00")
+    return db_connector, cursor
+
+
+def _rows(date: datetime.date) -> list[tuple]:
+    return [(student_id, date, 1, "P0011", 1 + student_id % 2, student_id,
+             True) for student_id in range(1, 11)]
+
+
+def test_attendance_writes_rebuild_the_roster_of_their_groups() -> None:
+    db_connector, cursor = _database()
+    date = datetime.date(2026, 11, 2)
+    add_attendance.add_attendances(db_connector, cursor, _rows(date),
+                                   chunk_size=4)
+    assert _roster_size(cursor) == 10
+
+    add_attendance.add_attendance(db_connector, cursor, student_id=11,
+                                  date=date, slot_no=1, course_code="P0011",
+                                  class_id=2, seat=11, is_present=True)
+    assert _roster_size(cursor) == 11
+
+
+def test_backfill_builds_a_missing_roster() -> None:
+    db_connector, cursor = _database()
+    date = datetime.date(2026, 11, 2)
+    cursor.executemany("""INSERT INTO `attendance`
+                       (`student_id`, `date`, `slot_no`, `course_code`,
+                       `class_id`, `seat`, `is_present`)
+                       VALUES (%s, %s, %s, %s, %s, %s, %s)""", _rows(date))
+    db_connector.commit()
+    assert _roster_size(cursor) == 0
+
+    exam_roster.backfill(db_connector, cursor)
+    assert _roster_size(cursor) == 10
+
+
+def _absent(cursor: memdb.Cursor, table: str) -> list[int]:
+    cursor.execute(f"""SELECT `student_id` FROM `{table}`
+                   WHERE NOT `is_present` ORDER BY `student_id`""")
+    return [row["student_id"] for row in cursor.fetchall()]
+
+
+def test_presence_is_marked_in_attendance_and_roster_together() -> None:
+    db_connector, cursor = _database()
+    date = datetime.date(2026, 11, 2)
+    add_attendance.add_attendances(db_connector, cursor, _rows(date))
+    cursor.execute("""DELETE FROM `exam_roster` WHERE `student_id`=3""")
+
+    changed = update_data.update_presence(db_connector, cursor, date=date,
+                                          slot_no=1, halls={2: "0-0-0-0-0"})
+    assert _absent(cursor, "attendance") == [1, 3, 5, 7, 9]
+    assert _absent(cursor, "exam_roster") == [1, 5, 7, 9]
+    assert changed == 9
+    assert update_data.update_presence(db_connector, cursor, date=date,
+                                       slot_no=1,
+                                       halls={2: "0-0-0-0-0"}) == 0
+
+    update_data.update_attendance(db_connector, cursor, student_id=2,
+                                  date=date, slot_no=1, is_present=False)
+    assert _absent(cursor, "attendance") == [1, 2, 3, 5, 7, 9]
+    assert _absent(cursor, "exam_roster") == [1, 2, 5, 7, 9]
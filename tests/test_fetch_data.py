@@ -0,0 +1,54 @@
+# Copyright 2025 Harikrishna Srinivasan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from benchmarks import memdb
+import attendance
+import datetime
+import fetch_data
+
+
+def test_get_invigilator_with_every_key_given() -> None:
+    db_connector = memdb.Connection()
+    cursor = db_connector.cursor()
+    attendance.create_hallplan(db_connector, cursor)
+    cursor.executemany("""INSERT INTO `invigilators`
+                       (`faculty_id`, `date`, `slot_no`, `class_id`)
+                       VALUES (%s, %s, %s, %s)""",
+                       [(7, datetime.date(2026, 11, 2), 1, 12),
+                        (8, datetime.date(2026, 11, 2), 1, 13),
+                        (7, datetime.date(2026, 11, 2), 2, 13)])
+    db_connector.commit()
+
+    assert fetch_data.get_invigilator(
+        cursor, faculty_id=7, date=datetime.date(2026, 11, 2), slot_no=1
+    ) == ({"class_id": 12},)
+
+
+def test_get_attendance_with_every_column_given() -> None:
+    db_connector = memdb.Connection()
+    cursor = db_connector.cursor()
+    attendance.create_hallplan(db_connector, cursor)
+    row = {"date": datetime.date(2026, 11, 2), "slot_no": 1,
+           "course_code": "P0011", "class_id": 12, "student_id": 5,
+           "seat": 3, "is_present": True}
+    cursor.execute("""INSERT INTO `attendance`
+                   (`date`, `slot_no`, `course_code`, `class_id`,
+                   `student_id`, `seat`, `is_present`)
+                   VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+                   list(row.values()))
+    db_connector.commit()
+
+    assert fetch_data.get_attendance(cursor, **row) == ({},)
+    assert list(fetch_data.iter_attendance(cursor, **row)) == [{}]
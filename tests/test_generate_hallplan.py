@@ -0,0 +1,90 @@
+# Copyright 2025 Harikrishna Srinivasan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from benchmarks import scenarios, synthetic
+from generate_hallplan import assign_invigilators, map_periods, replan_hallplan
+import pandas as pd
+import pytest
+
+PERIODS = ({"id": 1, "start_time": "08:45", "end_time": "09:35"},
+           {"id": 2, "start_time": "09:35", "end_time": "10:25"},
+           {"id": 3, "start_time": "10:40", "end_time": "11:30"})
+
+
+def periods(start: str, end: str) -> set:
+    return map_periods(pd.Series([start]), pd.Series([end]), PERIODS)[0]
+
+
+def test_map_periods_spans_start_to_end_period() -> None:
+    assert periods("09:00", "11:00") == {1, 2, 3}
+
+
+def test_map_periods_slot_within_a_period_takes_the_next() -> None:
+    assert periods("09:00", "09:20") == {1, 2}
+
+
+def test_map_periods_slot_ending_after_every_period_is_empty() -> None:
+    assert periods("10:00", "12:00") == set()
+
+
+def test_assign_invigilators_rejects_too_few_faculties() -> None:
+    date = pd.Timestamp("2026-11-02")
+    plan = pd.DataFrame({"Date": [date, date], "SlotNo": [1, 1],
+                         "ClassID": [1, 2]})
+    availability = pd.DataFrame({"FacultyID": [7], "Date": [date],
+                                 "SlotNo": [1]})
+    with pytest.raises(ValueError, match="02/11/2026 slot 1"):
+        assign_invigilators(plan, availability)
+
+
+def _seats(work: scenarios.Workload) -> pd.DataFrame:
+    work.cursor.execute("""SELECT `date`, `slot_no`, `student_id`,
+                        `class_id`, `seat`, `is_present`
+                        FROM `attendance`""")
+    return pd.DataFrame(work.cursor.fetchall()) \
+        .set_index(["date", "slot_no", "student_id"]).sort_index()
+
+
+def test_replan_keeps_valid_seats_presence_and_invigilators() -> None:
+    work = scenarios.Workload(synthetic.University(students=600, halls=12,
+                                                   groups=4))
+    work.store()
+    group = ("2026-11-02", 1)
+    work.cursor.execute("""UPDATE `attendance` SET `is_present`=0
+                        WHERE `date`=%s AND `slot_no`=%s
+                        AND `class_id` IN (1, 2)""", group)
+    work.cursor.executemany("""INSERT INTO `invigilators`
+                            (`faculty_id`, `date`, `slot_no`, `class_id`)
+                            VALUES (%s, %s, %s, %s)""",
+                            [(1, *group, 1), (2, *group, 2)])
+    work.db_connector.commit()
+    before = _seats(work)
+
+    halls = work.halls
+    replan_hallplan(work.db_connector, work.cursor,
+                    schedules=work.schedules,
+                    halls=halls[~((halls["Date"] == group[0])
+                                  & (halls["SlotNo"] == group[1])
+                                  & (halls["ID"] == 1))])
+    after = _seats(work)
+
+    in_group = before.index.droplevel("student_id").isin([group])
+    moved = in_group & (before["class_id"] == 1)
+    assert after.loc[~moved].equals(before.loc[~moved])
+    assert not (after.loc[in_group, "class_id"] == 1).any()
+    assert not after.loc[moved, "is_present"].astype(bool).any()
+    assert not after.loc[in_group].duplicated(["class_id", "seat"]).any()
+    work.cursor.execute("""SELECT `faculty_id` FROM `invigilators`""")
+    assert [row["faculty_id"] for row in work.cursor.fetchall()] == [2]
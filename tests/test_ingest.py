@@ -0,0 +1,40 @@
+# Copyright 2025 Harikrishna Srinivasan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import ingest
+import io
+import pytest
+
+
+def sheet(text: str) -> io.BytesIO:
+    return io.BytesIO(text.encode())
+
+
+def test_read_sheet_rejects_fractional_integers() -> None:
+    with pytest.raises(ValueError, match="rows 2-3"):
+        ingest.read_sheet(sheet("No,Capacity\n1,30\n2,12.5\n"), "halls",
+                          ["No", "Capacity"],
+                          dtypes={"No": "uint8", "Capacity": "uint8"})
+
+
+def test_read_sheet_merges_categories_across_chunks() -> None:
+    frame = ingest.read_sheet(sheet("Code,SlotNo\nA,1\nB,2\nA,3\n"),
+                              "schedules", ["Code", "SlotNo"],
+                              dtypes={"Code": "category", "SlotNo": "uint8"},
+                              chunk_size=2)
+    assert frame["Code"].tolist() == ["A", "B", "A"]
+    assert frame["Code"].dtype == "category"
+    assert frame["SlotNo"].dtype == "uint8"
+    assert list(frame.columns) == ["Code", "SlotNo"]
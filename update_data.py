@@ -14,10 +14,16 @@
 
 
 from Timetable.typehints import Connection, Cursor, Optional
+from collections.abc import Iterable
 import datetime
+import exam_roster
+import hallplan_cache
 
 """
 Updates the attendance and invigilator tables.
+Presence is written to `exam_roster` along with `attendance`,
+by one statement joining the two; an `attendance` row missing from
+the roster is still updated.
 """
 
 
@@ -27,13 +33,8 @@ def update_attendance(db_connector: Connection,
                       date: Optional[datetime.date],
                       slot_no: Optional[int],
                       is_present: Optional[bool]) -> None:
-    cursor.execute("""UPDATE `attendance`
-                   SET `is_present`=%s
-                   WHERE `date`=%s
-                   AND `slot_no`=%s
-                   AND `student_id`=%s""",
-                   (is_present, date, slot_no, student_id))
-    db_connector.commit()
+    update_attendances(db_connector, cursor,
+                       [(is_present, date, slot_no, student_id)])
 
 
 def update_attendances(
@@ -41,11 +42,131 @@ def update_attendances(
     cursor: Cursor,
     students: list[tuple[bool, datetime.date, int, str]]
 ) -> None:
-    cursor.executemany("""UPDATE `attendance`
-                       SET `is_present`=%s
-                       WHERE `date`=%s
-                       AND `slot_no`=%s
-                       AND `student_id`=%s""", students)
+    try:
+        cursor.executemany("""UPDATE `attendance` LEFT JOIN `exam_roster`
+                           USING (`date`, `slot_no`, `student_id`)
+                           SET `attendance`.`is_present`=%s,
+                           `exam_roster`.`is_present`=%s
+                           WHERE `attendance`.`date`=%s
+                           AND `attendance`.`slot_no`=%s
+                           AND `attendance`.`student_id`=%s""",
+                           [(is_present, is_present, *student)
+                            for is_present, *student in students])
+        hallplan_cache.stamp(cursor, "presence")
+    except Exception:
+        db_connector.rollback()
+        raise
+
+    db_connector.commit()
+
+
+def update_presence(db_connector: Connection,
+                    cursor: Cursor, /, *,
+                    date: datetime.date,
+                    slot_no: int,
+                    halls: dict[int, str]) -> int:
+    """
+    Marks the attendance of whole halls, one statement per hall
+    updating `attendance` and `exam_roster` together.
+
+    ``halls`` maps each class ID to a string indexed by seat, holding
+    ``"1"`` for present, ``"0"`` for absent and any other character
+    for seats to leave unchanged. Rows already holding the given value
+    are not touched, so resubmitting costs no writes.
+    Returns the number of rows changed, in both tables.
+    """
+    changed = 0
+    try:
+        for class_id, seats in halls.items():
+            changed += cursor.execute(
+                """UPDATE `attendance` LEFT JOIN `exam_roster`
+                USING (`date`, `slot_no`, `student_id`)
+                SET `attendance`.`is_present`=
+                (SUBSTRING(%s, `attendance`.`seat`, 1)='1'),
+                `exam_roster`.`is_present`=
+                (SUBSTRING(%s, `attendance`.`seat`, 1)='1')
+                WHERE `attendance`.`date`=%s
+                AND `attendance`.`slot_no`=%s
+                AND `attendance`.`class_id`=%s
+                AND SUBSTRING(%s, `attendance`.`seat`, 1) IN ('0', '1')
+                AND (`attendance`.`is_present`<>
+                     (SUBSTRING(%s, `attendance`.`seat`, 1)='1')
+                     OR `exam_roster`.`is_present`<>
+                     (SUBSTRING(%s, `attendance`.`seat`, 1)='1'))""",
+                (seats, seats, date, slot_no, class_id, seats, seats, seats)
+            )
+        if changed:
+            hallplan_cache.stamp(cursor, "presence")
+    except Exception:
+        db_connector.rollback()
+        raise
+
+    db_connector.commit()
+    return changed
+
+
+def replace_attendances(
+    db_connector: Connection,
+    cursor: Cursor, /, *,
+    stale: list[tuple[datetime.date, int, int]],
+    fresh: list[tuple[int | str | bool, ...]],
+    groups: Iterable[tuple[datetime.date, int]] = ()
+) -> None:
+    """
+    Deletes the ``stale`` (date, slot_no, student_id) rows and inserts
+    the ``fresh`` rows in one transaction, which also rebuilds the
+    roster of the (date, slot_no) ``groups``.
+
+    The invigilators of the ``groups`` are lifted out first, since they
+    reference the attendance rows, and put back in the same transaction
+    where their hall still seats students.
+    """
+    groups = list(groups)
+    try:
+        invigilators = []
+        for group in groups:
+            cursor.execute("""SELECT `faculty_id`, `date`, `slot_no`,
+                           `class_id` FROM `invigilators`
+                           WHERE `date`=%s
+                           AND `slot_no`=%s""", group)
+            invigilators.extend(cursor.fetchall())
+        if invigilators:
+            cursor.executemany("""DELETE FROM `invigilators`
+                               WHERE `date`=%s
+                               AND `slot_no`=%s""", groups)
+        if stale:
+            cursor.executemany("""DELETE FROM `attendance`
+                               WHERE `date`=%s
+                               AND `slot_no`=%s
+                               AND `student_id`=%s""", stale)
+        if fresh:
+            cursor.executemany("""INSERT INTO `attendance`
+                               (`date`, `slot_no`, `student_id`,
+                               `course_code`, `class_id`, `seat`,
+                               `is_present`)
+                               VALUES (%s, %s, %s, %s, %s, %s, %s)""", fresh)
+        if invigilators:
+            used: set[tuple] = set()
+            for group in groups:
+                cursor.execute("""SELECT DISTINCT `date`, `slot_no`,
+                               `class_id` FROM `attendance`
+                               WHERE `date`=%s
+                               AND `slot_no`=%s""", group)
+                used.update((row["date"], row["slot_no"], row["class_id"])
+                            for row in cursor.fetchall())
+            kept = [(row["faculty_id"], row["date"], row["slot_no"],
+                     row["class_id"]) for row in invigilators]
+            kept = [row for row in kept if row[1:] in used]
+            if kept:
+                cursor.executemany("""INSERT INTO `invigilators`
+                                   (`faculty_id`, `date`, `slot_no`,
+                                   `class_id`)
+                                   VALUES (%s, %s, %s, %s)""", kept)
+        exam_roster.rebuild(cursor, groups)
+    except Exception:
+        db_connector.rollback()
+        raise
+
     db_connector.commit()
 
 
@@ -55,10 +176,38 @@ def update_invigilator(db_connector: Connection,
                        date: Optional[datetime.date] = None,
                        slot_no: Optional[int] = None,
                        class_id: Optional[int] = None) -> None:
-    cursor.execute("""UPDATE `invigilator`
+    cursor.execute("""UPDATE `invigilators`
                    SET `faculty_id`=%s
                    WHERE `date`=%s
                    AND `slot_no`=%s
                    AND `class_id`=%s""",
                    (faculty_id, date, slot_no, class_id))
     db_connector.commit()
+
+
+def replace_invigilators(
+    db_connector: Connection,
+    cursor: Cursor, /, *,
+    groups: list[tuple[datetime.date, int]],
+    invigilators: list[tuple[int, datetime.date, int, int]]
+) -> None:
+    """
+    Replaces the invigilators of the (date, slot_no) ``groups`` with the
+    (faculty_id, date, slot_no, class_id) ``invigilators`` in one
+    transaction.
+    """
+    try:
+        if groups:
+            cursor.executemany("""DELETE FROM `invigilators`
+                               WHERE `date`=%s
+                               AND `slot_no`=%s""", groups)
+        if invigilators:
+            cursor.executemany("""INSERT INTO `invigilators`
+                               (`faculty_id`, `date`, `slot_no`,
+                               `class_id`)
+                               VALUES (%s, %s, %s, %s)""", invigilators)
+    except Exception:
+        db_connector.rollback()
+        raise
+
+    db_connector.commit()